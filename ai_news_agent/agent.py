@@ -1,21 +1,23 @@
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, Optional
 from dotenv import load_dotenv
-from google.adk.agents import Agent, ParallelAgent, SequentialAgent
-from google.adk.tools.base_tool import BaseTool
+from google.adk.agents import Agent, SequentialAgent
+from google.adk.agents.readonly_context import ReadonlyContext
+try:
+    from llm_cache import cache_for, model_callbacks
+except ImportError:  # Deployed without the llm_cache package.
+    def cache_for(agent, ttl=None):
+        return None
+
+    def model_callbacks(agent, *before, ttl=None):
+        return {"before_model_callback": list(before), "after_model_callback": []}
 
 # from google.adk.tools.computer_use.base_computer import BaseComputer
 # from google.adk.tools.computer_use.computer_use_toolset import ComputerUseToolset
-from google.genai import types
-from pydantic import BaseModel
-from .tools.tools import (
-    get_community_tweets_tool,
-    get_news_from_url_tool,
-    playwright_mcp_tool,
-    reddit_mcp_tool,
-)
+from .dedup import DedupAgent, mark_published
+from .researchers import ResearchAgent
+from .synthesis import HierarchicalSynthesisAgent
 load_dotenv()
 
 
@@ -28,216 +30,89 @@ logging.getLogger("opentelemetry").setLevel(logging.ERROR)
 
 
 MODEL = "gemini-2.5-flash"
+# Sources live in sites.yaml (AI_NEWS_SITES_FILE), AI_NEWS_SITES selects a subset.
+# "llm": one Agent per site calls its tool (get_news_from_url, ...) and summarizes it.
+# "direct": fetch and twitter sites are fetched without the model, only
+# SynthesisAgent (and the MCP-based researchers) use it.
+RESEARCH_MODE = os.getenv("AI_NEWS_RESEARCH_MODE", "llm")
+# "single": one SynthesisAgent call over every item.
+# "hierarchical": map-reduce over batches, for large source sets.
+SYNTHESIS_MODE = os.getenv("AI_NEWS_SYNTHESIS_MODE", "single")
+
+
+# Researchers are built from sites.yaml when the pipeline first runs
+parallel_research = ResearchAgent(
+    name="ParallelToolExecution",
+    mode=RESEARCH_MODE,
+    site_deadline=float(os.getenv("AI_NEWS_SITE_DEADLINE", "120")),
+    deadline=float(os.getenv("AI_NEWS_RESEARCH_DEADLINE", "300")),
+    # Send each source's result to the client as soon as it is in.
+    stream_partials=os.getenv("AI_NEWS_STREAM_PARTIALS") == "1",
+    description="Executes all tool-using agents in parallel",
+)
 
-class Site(BaseModel):
-    name: str
-    url: str
-    result_key: str
-
+# Collapse the same story reported by several sources before synthesis
+dedup_agent = DedupAgent(
+    name="DedupAgent",
+    output_key="news_items",
+    description="Merges duplicate news items across sources",
+)
 
-researcher_agents = []
-fetch_sites = [
-    Site(
-        name="hacker_news",
-        url="https://news.ycombinator.com/",
-        result_key="hacker_news_result",
-    ),
-    Site(
-        name="tech_crunch",
-        url="https://techcrunch.com/category/artificial-intelligence/",
-        result_key="tech_crunch_result",
-    ),
-    # Site(
-    #     name="the_verge",
-    #     url="https://www.theverge.com/ai-artificial-intelligence",
-    #     result_key="the_verge_result",
-    # ),
-    Site(
-        name="ai_weekly",
-        url="https://aiweekly.co/",
-        result_key="ai_weekly_result",
-    ),
-    Site(
-        name="artificial_intelligence_news",
-        url="https://www.artificialintelligence-news.com/",
-        result_key="artificial_intelligence_news_result",
-    ),
-    Site(
-        name="venture_beat",
-        url="https://venturebeat.com/",
-        result_key="venture_beat_result",
-    ),
-    Site(
-        name="technology_review",
-        url="https://www.technologyreview.com/topic/artificial-intelligence/",
-        result_key="technology_review_result",
-    ),
-    Site(
-        name="sciencedaily",
-        url="https://www.sciencedaily.com/news/computers_math/artificial_intelligence/",
-        result_key="sciencedaily_result",
-    ),
-    Site(
-        name="wired",
-        url="https://www.wired.com/tag/artificial-intelligence/",
-        result_key="wired_result",
-    ),
-    Site(
-        name="forbes",
-        url="https://www.forbes.com/ai/",
-        result_key="forbes_result",
-    ),
-    Site(
-        name="google_ai",
-        url="https://blog.google/technology/ai/",
-        result_key="google_ai_result",
-    ),
-    Site(
-        name="google_cloud_ai",
-        url="https://cloud.google.com/blog/products/ai-machine-learning",
-        result_key="google_cloud_ai_result",
-    ),
-    Site(
-        name="deepmind",
-        url="https://deepmind.google/discover/blog/",
-        result_key="deepmind_result",
-    ),
-    Site(
-        name="google_developers_blog",
-        url="https://developers.googleblog.com/en/search/?technology_categories=AI",
-        result_key="google_developers_blog_result",
-    ),
-    Site(
-        name="anthropic_news",
-        url="https://www.anthropic.com/news",
-        result_key="anthropic_news_result",
-    ),
-]
-twitter_sites = [
-    Site(
-        name="twitter_ai_rumors_and_insights",
-        url="1762494276565426592",
-        result_key="twitter_ai_rumors_and_insights_result",
-    ),
-]
-playwright_sites = [
-    # Site(
-    #     name="twitter",
-    #     url="https://x.com/i/communities/1762494276565426592",
-    #     result_key="twitter_result",
-    # ),
-    # Site(
-    #     name="openai",
-    #     url="https://openai.com/news/",
-    #     result_key="openai_result",
-    # ),
-    # Site(
-    #     name="aibusiness",
-    #     url="https://aibusiness.com/ml",
-    #     result_key="aibusiness_result",
-    # ),
-]
-reddit_sites = [
-    Site(
-        name="r_singularity",
-        url="singularity",
-        result_key="reddit_singularity_result",
-    ),
-    Site(
-        name="r_accelerate",
-        url="accelerate",
-        result_key="reddit_accelerate_result",
-    ),
-    Site(
-        name="r_technology",
-        url="technology",
-        result_key="reddit_technology_result",
-    ),
-]
+SYNTHESIS_INSTRUCTION = (
+    "You are a a specialist in AI and AI products and models.\n"
+    "Your goal is to generate news articles about AI and AI products and models.\n"
+    "Combine results from parallel research, already merged across sources.\n"
+    "When the items are marked as new since the last digest, only write about what is new.\n"
+    "If some sources are listed as missing, say so briefly at the end of the article.\n"
+    "Then generate a news article about the latest news.\n"
+    "Your article should be a markdown list of news items. Try to include dates and links to the news items. Order by date desc.\n"
+)
 
 
-def get_news_prompt(site: Site, tool_name: str):
-    return (
-        "Research AI news.\n"
-        f"Navigate to this website, using {tool_name}, to get the latest news about AI and AI products and models:\n"
-        f"url: {site.url}, state_key: {site.result_key}\n"
-        "Your article should be a markdown list of news items. Try to include dates and links to the news items.\n"
+def synthesis_instruction(context: ReadonlyContext) -> str:
+    # Dated on every run, long-lived workers outlive the day they started.
+    return SYNTHESIS_INSTRUCTION + (
         f"Keep only the news for the latest 3 days. Today is {datetime.now().strftime('%d %b %Y')}"
     )
 
 
-for i, site in enumerate(playwright_sites):
-    researcher_agent = Agent(
-        name=f"{site.name}_researcher",
-        model="gemini-2.5-flash",
-        instruction=get_news_prompt(site, "browser_tab_new"),
-        tools=[playwright_mcp_tool],
-        output_key=site.result_key,
-    )
-    researcher_agents.append(researcher_agent)
+def synthesis_instruction_with_items(context: ReadonlyContext) -> str:
+    # Instruction providers skip {state} templating, add the items here.
+    return synthesis_instruction(context) + f"\nResearch results:\n{context.state.get('news_items', '')}"
 
+# The same news items get the same digest, for as long as the items are fresh.
+SYNTHESIS_CACHE_TTL = float(os.getenv("AI_NEWS_SYNTHESIS_CACHE_TTL", "3600"))
 
-
-
-
-for i, site in enumerate(reddit_sites):
-    researcher_agent = Agent(
-        name=f"{site.name}_researcher",
-        model="gemini-2.5-flash",
-        instruction=get_news_prompt(site, "fetch_reddit_hot_threads"),
-        tools=[reddit_mcp_tool],
-        # output_key=site.result_key,
-        # after_tool_callback=create_after_tool_callback(site),
-    )
-    researcher_agents.append(researcher_agent)
-
-for i, site in enumerate(fetch_sites):
-    researcher_agent = Agent(
-        name=f"{site.name}_researcher",
+# Optional: Combine with SequentialAgent for post-processing
+if SYNTHESIS_MODE == "hierarchical":
+    synthesis_agent = HierarchicalSynthesisAgent(
+        name="SynthesisAgent",
         model="gemini-2.5-flash",
-        instruction=get_news_prompt(site, "get_news_from_url"),
-        tools=[get_news_from_url_tool],
-        # output_key=site.result_key,
+        instruction=synthesis_instruction,
+        input_key="news_items",
+        fan_in=int(os.getenv("AI_NEWS_SYNTHESIS_FAN_IN", "4")),
+        max_depth=int(os.getenv("AI_NEWS_SYNTHESIS_DEPTH", "2")),
+        cache=cache_for("SynthesisAgent", SYNTHESIS_CACHE_TTL),
+        after_agent_callback=mark_published,
+        description="Synthesizes parallel results",
     )
-    researcher_agents.append(researcher_agent)
-
-for i, site in enumerate(twitter_sites):
-    researcher_agent = Agent(
-        name=f"{site.name}_researcher",
+else:
+    synthesis_agent = Agent(
+        name="SynthesisAgent",
         model="gemini-2.5-flash",
-        instruction=get_news_prompt(site, "get_community_tweets"),
-        tools=[get_community_tweets_tool],
-        # output_key=site.result_key,
+        instruction=synthesis_instruction_with_items,
+        # The research results reach the model through the instruction only.
+        include_contents="none",
+        **model_callbacks("SynthesisAgent", ttl=SYNTHESIS_CACHE_TTL),
+        after_agent_callback=mark_published,
+        description="Synthesizes parallel results",
     )
-    researcher_agents.append(researcher_agent)
-
-# ParallelAgent executes all researchers concurrently
-parallel_research = ParallelAgent(
-    name="ParallelToolExecution",
-    sub_agents=researcher_agents,
-    description="Executes all tool-using agents in parallel",
-)
-
-# Optional: Combine with SequentialAgent for post-processing
-synthesis_agent = Agent(
-    name="SynthesisAgent",
-    model="gemini-2.5-flash",
-    instruction=(
-        "You are a a specialist in AI and AI products and models.\n"
-        "Your goal is to generate news articles about AI and AI products and models.\n"
-        "Combine results from parallel research:\n"
-        "Then generate a news article about the latest news.\n"
-        "Your article should be a markdown list of news items. Try to include dates and links to the news items. Order by date desc.\n"
-        "Keep only the news for the latest 3 days. Today is {datetime.now().strftime('%d %b %Y')}"
-    ),
-    description="Synthesizes parallel results",
-)
 
-# Full pipeline: parallel execution then synthesis
+# Full pipeline: parallel execution, deduplication then synthesis
 root_agent = SequentialAgent(
     name="ai_news_agent",
     description=(
         "AI news specialist agent that generates news articles about AI and AI products."
     ),
-    sub_agents=[parallel_research, synthesis_agent],
+    sub_agents=[parallel_research, dedup_agent, synthesis_agent],
 )
@@ -0,0 +1,275 @@
+import hashlib
+import logging
+import random
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .seen_store import FULL_REBUILD_KEY, SeenStore, is_incremental, seen_store
+from .sites import registered_sites
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 Jaccard become candidates
+SIMILARITY_THRESHOLD = 0.7
+# Items linking to different pages only merge when their titles share at
+# least this share of their words, e.g. not "Gemini 2.5 Pro" / "Gemini 2.5 Flash".
+DIFFERENT_URL_THRESHOLD = 0.85
+SHINGLE_SIZE = 4
+TRACKING_PARAMS = {"ref", "ref_src", "source", "fbclid", "gclid", "mc_cid", "mc_eid", "cmpid"}
+PENDING_KEY = "news_items_pending"
+# Prefix of the state entries holding a source's next watermark until published.
+PENDING_WATERMARK_PREFIX = "watermark_pending:"
+GENERIC_LINK_TEXT = {"link", "source", "here", "read more", "more", "article", "comments"}
+
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*\S)")
+_LINK = re.compile(r"\[([^\]]*)\]\((https?://[^)\s]+)\)")
+_BARE_URL = re.compile(r"https?://[^\s)>]+")
+_MARKUP = re.compile(r"[*_`#>]+")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+@dataclass
+class NewsItem:
+    text: str
+    title: str
+    url: Optional[str]
+    sources: List[str] = field(default_factory=list)
+    # Fingerprints of every item merged into this one.
+    fingerprints: List[str] = field(default_factory=list)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a link: no tracking params, fragment, www or trailing /."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", title.lower()).split())
+
+
+def parse_items(markdown: str, source: str) -> List[NewsItem]:
+    """Reads the list items of a researcher's markdown result."""
+    items = []
+    for line in markdown.splitlines():
+        match = _LIST_ITEM.match(line)
+        if not match:
+            continue
+        text = match.group(1)
+        link = _LINK.search(text)
+        bare_url = _BARE_URL.search(text)
+        url = link.group(2) if link else bare_url.group(0) if bare_url else None
+        title = link.group(1).strip() if link else ""
+        if not title or title.lower() in GENERIC_LINK_TEXT or len(title.split()) < 3:
+            title = _MARKUP.sub("", _BARE_URL.sub("", _LINK.sub("", text)))
+        items.append(NewsItem(text=text, title=title.strip(), url=url, sources=[source]))
+    return items
+
+
+def fingerprints_of(item: NewsItem) -> List[str]:
+    """Keys under which an item is remembered: its url and its title."""
+    keys = []
+    if item.url:
+        keys.append("url:" + hashlib.sha1(normalize_url(item.url).encode()).hexdigest())
+    keys.append("title:" + hashlib.sha1(normalize_title(item.title).encode()).hexdigest())
+    return keys
+
+
+def drop_seen_items(markdown: str, store: SeenStore) -> str:
+    """Removes the list items of `markdown` that were already published."""
+    lines = [(line, parse_items(line, "")) for line in markdown.splitlines()]
+    keys = {key: None for _, items in lines for item in items for key in fingerprints_of(item)}
+    seen = store.seen(keys)
+    return "\n".join(
+        line
+        for line, items in lines
+        if not any(key in seen for item in items for key in fingerprints_of(item))
+    )
+
+
+def _shingles(title: str) -> set:
+    text = normalize_title(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(title: str) -> List[int]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in _shingles(title)
+    ]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _similarity(left: List[int], right: List[int]) -> float:
+    return sum(x == y for x, y in zip(left, right)) / NUM_PERMUTATIONS
+
+
+def _word_similarity(left: str, right: str) -> float:
+    left_words, right_words = set(normalize_title(left).split()), set(normalize_title(right).split())
+    if not left_words or not right_words:
+        return 0.0
+    return len(left_words & right_words) / len(left_words | right_words)
+
+
+def _same_story(left: NewsItem, right: NewsItem) -> bool:
+    """Whether two items with similar title signatures are the same story."""
+    if left.url and right.url and normalize_url(left.url) != normalize_url(right.url):
+        return _word_similarity(left.title, right.title) >= DIFFERENT_URL_THRESHOLD
+    return True
+
+
+def deduplicate(items: List[NewsItem]) -> List[NewsItem]:
+    """Collapses items sharing a normalized url or a near-duplicate title.
+
+    Candidate pairs come from MinHash LSH buckets, so the cost stays close to
+    linear in the number of items. Items linking to different pages need
+    near-identical titles to merge. Each cluster becomes one canonical item
+    (the most detailed line) listing every source it was seen on.
+    """
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        parent[find(i)] = find(j)
+
+    by_url: Dict[str, int] = {}
+    for i, item in enumerate(items):
+        if item.url:
+            key = normalize_url(item.url)
+            if key in by_url:
+                union(i, by_url[key])
+            else:
+                by_url[key] = i
+
+    signatures = [minhash(item.title) for item in items]
+    rows = NUM_PERMUTATIONS // BANDS
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            buckets[tuple(signature[band * rows : (band + 1) * rows])].append(i)
+        for bucket in buckets.values():
+            for j in bucket[1:]:
+                if (
+                    find(j) != find(bucket[0])
+                    and _similarity(signatures[bucket[0]], signatures[j]) >= SIMILARITY_THRESHOLD
+                    and _same_story(items[bucket[0]], items[j])
+                ):
+                    union(j, bucket[0])
+
+    clusters = defaultdict(list)
+    for i in range(len(items)):
+        clusters[find(i)].append(items[i])
+    merged = []
+    for members in clusters.values():
+        canonical = max(members, key=lambda item: (item.url is not None, len(item.text)))
+        sources = list(dict.fromkeys(s for item in members for s in item.sources))
+        keys = list(dict.fromkeys(key for item in members for key in fingerprints_of(item)))
+        merged.append(NewsItem(canonical.text, canonical.title, canonical.url, sources, keys))
+    return merged
+
+
+def render_items(items: Iterable[NewsItem]) -> str:
+    return "\n".join(f"- {item.text} (sources: {', '.join(item.sources)})" for item in items)
+
+
+def mark_published(callback_context: CallbackContext) -> Optional[types.Content]:
+    """after_agent_callback for the synthesis step: records the digested items.
+
+    Also moves the watermarks staged by the researchers of this run.
+    """
+    pending = callback_context.state.get(PENDING_KEY) or []
+    if pending:
+        seen_store.mark(pending)
+        callback_context.state[PENDING_KEY] = []
+    for key, value in callback_context.state.to_dict().items():
+        if key.startswith(PENDING_WATERMARK_PREFIX) and value:
+            seen_store.set_watermark(key[len(PENDING_WATERMARK_PREFIX):], value)
+            callback_context.state[key] = None
+    callback_context.state[FULL_REBUILD_KEY] = False
+    return None
+
+
+class DedupAgent(BaseAgent):
+    """Merges the researchers' results into one deduplicated list of items.
+
+    Reads the `result_key` of every registered site from state and writes the rendered list to
+    `output_key`, which SynthesisAgent consumes instead of the raw results.
+    In incremental mode only items missing from the seen store are kept;
+    their fingerprints wait in state until `mark_published` commits them.
+    """
+
+    output_key: str = "news_items"
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        items = []
+        for site in registered_sites():
+            result = ctx.session.state.get(site.result_key)
+            if not isinstance(result, str) or not result.strip():
+                continue
+            # A result with no list in it is kept whole rather than dropped.
+            parsed = parse_items(result, site.name) or [
+                NewsItem(result.strip(), result.strip()[:200], None, [site.name])
+            ]
+            items.extend(parsed)
+        merged = deduplicate(items)
+        stats = {"items_in": len(items), "items_out": len(merged)}
+        rendered = render_items(merged)
+        if is_incremental(ctx.session.state):
+            seen = seen_store.seen(key for item in merged for key in item.fingerprints)
+            merged = [item for item in merged if not seen.intersection(item.fingerprints)]
+            stats["items_new"] = len(merged)
+            rendered = (
+                f"New since the last digest:\n{render_items(merged)}"
+                if merged
+                else "No new items since the last digest."
+            )
+        missing = ctx.session.state.get("missing_sources") or []
+        if missing:
+            rendered += f"\nMissing sources (timed out or failed): {', '.join(missing)}"
+        logger.info("Deduplicated news items: %s", stats)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={
+                    self.output_key: rendered,
+                    f"{self.output_key}_stats": stats,
+                    PENDING_KEY: [key for item in merged for key in item.fingerprints],
+                }
+            ),
+        )
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import AsyncGenerator, Callable, Dict, List, Optional
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+from .scheduler import ResearchScheduler, throttle_model_calls
+from .seen_store import is_incremental
+from .sites import Site, load_sites, register_sites
+from .tools.mcp_pool import mcp_pool
+from .tools.tools import (
+    fetch_source,
+    get_community_tweets_tool,
+    get_news_from_url_tool,
+    get_playwright_mcp_tool,
+    get_reddit_mcp_tool,
+)
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gemini-2.5-flash"
+
+# Tools an LLM researcher gets, per site type.
+TOOLS: Dict[str, Callable[[], object]] = {
+    "fetch": lambda: get_news_from_url_tool,
+    "twitter": lambda: get_community_tweets_tool,
+    "reddit": get_reddit_mcp_tool,
+    "playwright": get_playwright_mcp_tool,
+}
+
+
+def get_news_prompt(site: Site, tool_name: str):
+    return (
+        "Research AI news.\n"
+        f"Navigate to this website, using {tool_name}, to get the latest news about AI and AI products and models:\n"
+        f"url: {site.url}, state_key: {site.result_key}\n"
+        "Your article should be a markdown list of news items. Try to include dates and links to the news items.\n"
+        f"Keep only the news for the latest 3 days. Today is {datetime.now().strftime('%d %b %Y')}"
+    )
+
+
+class FetchResearcher(BaseAgent):
+    """Researcher that fetches and extracts a site without calling the model.
+
+    It does what an LLM researcher does with get_news_from_url (or
+    get_community_tweets for twitter sites), minus the two
+    model round-trips: the extracted markdown goes straight into
+    `site.result_key` and is also emitted as the agent's reply so
+    SynthesisAgent sees it like any other researcher output.
+    """
+
+    site: Site
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        # Errors propagate, so ResearchAgent lists the site as missing.
+        pending: Dict[str, str] = {}
+        markdown, stats = await fetch_source(
+            self.site, skip_seen=is_incremental(ctx.session.state), pending=pending
+        )
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=f"## {self.site.name}\n{markdown}")],
+            ),
+            actions=EventActions(
+                state_delta={
+                    self.site.result_key: markdown,
+                    f"{self.site.result_key}_stats": stats,
+                    **pending,
+                }
+            ),
+        )
+
+
+def build_researcher(site: Site, mode: str = "llm") -> BaseAgent:
+    """The researcher agent of a site; `mode="direct"` skips the model where it can."""
+    if mode == "direct" and site.type in ("fetch", "twitter"):
+        return FetchResearcher(name=f"{site.name}_researcher", site=site)
+    return Agent(
+        name=f"{site.name}_researcher",
+        model=MODEL,
+        # Dated when each run starts, not when the researcher is built.
+        instruction=lambda context: get_news_prompt(site, site.tool_name),
+        tools=[TOOLS[site.type]()],
+        output_key=site.result_key,
+        before_model_callback=throttle_model_calls,
+    )
+
+
+class ResearchAgent(BaseAgent):
+    """Runs one researcher per enabled site, concurrently, through a scheduler.
+
+    Sites are read from the site registry and the researchers (and the MCP
+    toolsets they need) are only built when the pipeline first runs, so
+    importing the agent stays cheap and disabled sites cost nothing.
+    Researchers start as the ResearchScheduler admits them; the time each
+    one spent queued and running is logged and stored in `research_timings`.
+
+    A site whose researcher cannot be built (e.g. its MCP server is not
+    configured) is left out and listed in `missing_sources`; building it is
+    tried again on the next run.
+
+    Each researcher gets `site.deadline` (or `site_deadline`) seconds once
+    admitted and the whole stage gets `deadline` seconds. Whatever did not
+    finish in time is cancelled and listed in `missing_sources`, so synthesis
+    starts with the results at hand. With `stream_partials`, each result is
+    also sent to the client as a partial event as soon as it is in.
+    """
+
+    mode: str = "llm"
+    sites_file: Optional[str] = None
+    scheduler: ResearchScheduler = Field(default_factory=ResearchScheduler)
+    site_deadline: float = 120
+    deadline: float = 300
+    stream_partials: bool = False
+    _sites: Dict[str, Site] = PrivateAttr(default_factory=dict)
+    _all_sites: Optional[List[Site]] = PrivateAttr(default=None)
+    # Sites whose researcher could not be built, with the reason.
+    _unavailable: Dict[str, str] = PrivateAttr(default_factory=dict)
+
+    def build(self) -> List[BaseAgent]:
+        if self._all_sites is None:
+            sites = load_sites(self.sites_file) if self.sites_file else load_sites()
+            register_sites(sites)
+            self._all_sites = sites
+            self._unavailable = {site.name: "not built" for site in sites}
+        if self._unavailable:
+            built = []
+            for site in self._all_sites:
+                if site.name not in self._unavailable:
+                    continue
+                try:
+                    built.append((site, build_researcher(site, self.mode)))
+                except Exception as e:
+                    logger.warning("Leaving %s out, its researcher could not be built: %s", site.name, e)
+                    self._unavailable[site.name] = str(e)
+            for site, researcher in built:
+                researcher.parent_agent = self
+                self.sub_agents.append(researcher)
+                self._sites[researcher.name] = site
+                del self._unavailable[site.name]
+            logger.info("Built %d researchers, %d unavailable", len(self.sub_agents), len(self._unavailable))
+        return self.sub_agents
+
+    def _branch_ctx(self, ctx: InvocationContext, agent: BaseAgent) -> InvocationContext:
+        # Same branch naming as ParallelAgent, so researchers don't see each other.
+        ctx = ctx.model_copy()
+        suffix = f"{self.name}.{agent.name}"
+        ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+        return ctx
+
+    async def _run_researcher(self, ctx, agent, queue, timings):
+        site = self._sites[agent.name]
+        queued = time.monotonic()
+
+        async def drain():
+            async for event in agent.run_async(self._branch_ctx(ctx, agent)):
+                # Wait until the runner has applied the event before going on.
+                processed = asyncio.Event()
+                await queue.put(("event", event, processed))
+                await processed.wait()
+
+        try:
+            async with self.scheduler.slot(site, site.priority):
+                started = time.monotonic()
+                await asyncio.wait_for(drain(), site.deadline or self.site_deadline)
+            timings[site.name] = {
+                "queue_wait": round(started - queued, 3),
+                "execution": round(time.monotonic() - started, 3),
+            }
+        except asyncio.TimeoutError:
+            logger.warning("Researcher %s missed its deadline", agent.name)
+            timings[site.name] = {"error": "deadline exceeded"}
+        except Exception as e:
+            # One broken source must not sink the digest.
+            logger.warning("Researcher %s failed: %s", agent.name, e)
+            timings[site.name] = {"error": str(e)}
+        finally:
+            await queue.put(("done", site, None))
+
+    def _partial(self, ctx: InvocationContext, site: Site) -> Optional[Event]:
+        result = ctx.session.state.get(site.result_key)
+        if not isinstance(result, str) or not result.strip():
+            return None
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            partial=True,
+            content=types.Content(
+                role="model", parts=[types.Part(text=f"### {site.name}\n{result}\n")]
+            ),
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        researchers = self.build()
+        # Start (or health check) every MCP server up front and concurrently,
+        # rather than inside each researcher's tool timeout.
+        health = await mcp_pool.warm_up()
+        if health:
+            logger.info("MCP servers: %s", health)
+        # Results of an earlier run must not pass for this run's.
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={
+                    key: None
+                    for site in self._all_sites
+                    for key in (site.result_key, f"{site.result_key}_stats")
+                }
+            ),
+        )
+
+        queue: asyncio.Queue = asyncio.Queue()
+        timings: Dict[str, Dict[str, float]] = {
+            name: {"error": reason} for name, reason in self._unavailable.items()
+        }
+        tasks = [
+            asyncio.create_task(self._run_researcher(ctx, agent, queue, timings))
+            for agent in researchers
+        ]
+        end = time.monotonic() + self.deadline
+        try:
+            remaining = len(tasks)
+            while remaining:
+                try:
+                    kind, item, processed = await asyncio.wait_for(
+                        queue.get(), max(end - time.monotonic(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("Research deadline reached, %d researcher(s) left", remaining)
+                    break
+                if kind == "event":
+                    yield item
+                    processed.set()
+                    continue
+                remaining -= 1
+                if self.stream_partials:
+                    partial = self._partial(ctx, item)
+                    if partial:
+                        yield partial
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # An empty result is a source with nothing (new) to report, not a failure.
+        missing = [
+            site.name
+            for site in self._all_sites
+            if "error" in timings.setdefault(site.name, {"error": "cancelled"})
+        ]
+        logger.info("Research timings (seconds): %s", timings)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={"research_timings": timings, "missing_sources": missing}
+            ),
+        )
@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from .sites import Site
+
+MAX_CONCURRENCY = int(os.getenv("AI_NEWS_MAX_CONCURRENCY", "8"))
+MODEL_CALLS_PER_MINUTE = float(os.getenv("AI_NEWS_MODEL_RPM", "60"))
+# Researchers of one site type running at once, e.g. to spare the Reddit MCP server.
+TOOL_LIMITS = {"fetch": 8, "reddit": 2, "twitter": 1, "playwright": 2}
+PER_HOST_LIMIT = 2
+
+# Hosts of the sites whose url is not a web page.
+TOOL_HOSTS = {"reddit": "reddit.com", "twitter": "api.twitterapi.io"}
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind(self) -> asyncio.Lock:
+        # The lock belongs to one event loop, a new one (e.g. another
+        # asyncio.run for the next digest) gets a new lock.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self):
+        async with self._bind():
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ResearchScheduler:
+    """Admits researchers under a global cap and per-tool / per-host caps.
+
+    Waiting researchers are admitted by priority (higher first, then arrival
+    order). A waiter whose own caps are full does not hold up lower priority
+    ones that could run, so one slow or saturated source cannot starve the
+    rest.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        tool_limits: Optional[Dict[str, int]] = None,
+        per_host_limit: int = PER_HOST_LIMIT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tool_limits = tool_limits if tool_limits is not None else TOOL_LIMITS
+        self.per_host_limit = per_host_limit
+        self._running = 0
+        self._running_by_key: Dict[str, int] = {}
+        self._waiting: List[tuple] = []
+        self._order = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind(self) -> asyncio.Condition:
+        # Like TokenBucket._bind; what ran or waited on another loop is gone.
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._running = 0
+            self._running_by_key = {}
+            self._waiting = []
+        return self._condition
+
+    def _keys(self, site: Site) -> Dict[str, int]:
+        host = TOOL_HOSTS.get(site.type) or urlsplit(site.url).netloc.lower()
+        return {
+            f"tool:{site.type}": self.tool_limits.get(site.type, self.max_concurrency),
+            f"host:{host}": self.per_host_limit,
+        }
+
+    def _keys_free(self, keys: Dict[str, int]) -> bool:
+        return all(self._running_by_key.get(key, 0) < limit for key, limit in keys.items())
+
+    def _admissible(self, ticket: tuple) -> bool:
+        if self._running >= self.max_concurrency:
+            return False
+        runnable = [waiter for waiter in self._waiting if self._keys_free(waiter[2])]
+        return bool(runnable) and min(runnable) is ticket
+
+    @asynccontextmanager
+    async def slot(self, site: Site, priority: int = 0):
+        condition = self._bind()
+        keys = self._keys(site)
+        ticket = (-priority, next(self._order), keys)
+        async with condition:
+            self._waiting.append(ticket)
+            try:
+                await condition.wait_for(lambda: self._admissible(ticket))
+            except BaseException:
+                self._waiting.remove(ticket)
+                condition.notify_all()
+                raise
+            self._waiting.remove(ticket)
+            self._running += 1
+            for key in keys:
+                self._running_by_key[key] = self._running_by_key.get(key, 0) + 1
+            # Others may be admissible now that the head of the queue moved.
+            condition.notify_all()
+        try:
+            yield
+        finally:
+            async with condition:
+                self._running -= 1
+                for key in keys:
+                    self._running_by_key[key] -= 1
+                condition.notify_all()
+
+
+model_bucket = TokenBucket(rate=MODEL_CALLS_PER_MINUTE / 60, capacity=max(MODEL_CALLS_PER_MINUTE / 6, 1))
+
+
+async def throttle_model_calls(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """before_model_callback spacing researcher model calls to the shared rate."""
+    await model_bucket.acquire()
+    return None
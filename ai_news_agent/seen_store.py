@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Mapping, Optional, Set
+
+from .tools.http_cache import CACHE_DIR
+
+# "full": every run digests everything the researchers find.
+# "incremental": items published by an earlier digest are left out.
+DIGEST_MODE = os.getenv("AI_NEWS_DIGEST_MODE", "full")
+FULL_REBUILD_KEY = "full_rebuild"
+
+
+def is_incremental(state: Mapping) -> bool:
+    """Whether this run should skip already published items.
+
+    Setting `full_rebuild` in session state (or AI_NEWS_FULL_REBUILD=1)
+    forces a full digest for a run without leaving incremental mode.
+    """
+    if os.getenv("AI_NEWS_FULL_REBUILD") == "1" or state.get(FULL_REBUILD_KEY):
+        return False
+    return DIGEST_MODE == "incremental"
+
+
+class SeenStore:
+    """Persistent set of published news item fingerprints.
+
+    Each item is recorded under a hash of its normalized url and a hash of
+    its normalized title (see dedup.fingerprints_of), with the time it was
+    first published. Sources that page through a feed also keep a watermark
+    here, e.g. the newest tweet id already fetched.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen (fingerprint TEXT PRIMARY KEY, first_seen REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks (source TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._db.commit()
+
+    def seen(self, fingerprints: Iterable[str]) -> Set[str]:
+        """Returns the subset of `fingerprints` already in the store."""
+        fingerprints = list(fingerprints)
+        found = set()
+        with self._lock:
+            # Stay under SQLite's bound parameter limit.
+            for i in range(0, len(fingerprints), 500):
+                chunk = fingerprints[i : i + 500]
+                rows = self._db.execute(
+                    f"SELECT fingerprint FROM seen WHERE fingerprint IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def mark(self, fingerprints: Iterable[str]):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen VALUES (?, ?)",
+                ((fingerprint, now) for fingerprint in fingerprints),
+            )
+            self._db.commit()
+
+    def get_watermark(self, source: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM watermarks WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, source: str, value: str):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?)", (source, value))
+            self._db.commit()
+
+    def reset(self):
+        with self._lock:
+            self._db.execute("DELETE FROM seen")
+            self._db.execute("DELETE FROM watermarks")
+            self._db.commit()
+
+
+seen_store = SeenStore(os.path.join(CACHE_DIR, "seen_items.sqlite3"))
@@ -0,0 +1,80 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import yaml
+from pydantic import BaseModel
+
+# Seconds a fetched page is served from the HTTP cache before revalidation.
+DEFAULT_TTL = 600
+# Hard cap on the text a site may hand to the model (about 5k tokens).
+DEFAULT_MAX_CHARS = 20_000
+
+SITES_FILE = os.getenv(
+    "AI_NEWS_SITES_FILE", os.path.join(os.path.dirname(__file__), "sites.yaml")
+)
+
+DEFAULT_TOOLS = {
+    "fetch": "get_news_from_url",
+    "reddit": "fetch_reddit_hot_threads",
+    "twitter": "get_community_tweets",
+    "playwright": "browser_tab_new",
+}
+
+
+class Site(BaseModel):
+    name: str
+    url: str
+    result_key: str
+    type: str = "fetch"
+    tool: Optional[str] = None
+    enabled: bool = True
+    # Higher runs first when the research scheduler is saturated.
+    priority: int = 0
+    # Seconds the researcher may run before synthesis goes on without it.
+    deadline: Optional[float] = None
+    ttl: int = DEFAULT_TTL
+    extractor: str = "links"
+    max_chars: int = DEFAULT_MAX_CHARS
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool or DEFAULT_TOOLS[self.type]
+
+
+_sites_by_url: Dict[str, Site] = {}
+
+
+def register_sites(sites: Iterable[Site]):
+    """Makes sites discoverable by the tools, which only receive a url."""
+    for site in sites:
+        _sites_by_url[site.url] = site
+
+
+def get_site(url: str) -> Optional[Site]:
+    return _sites_by_url.get(url)
+
+
+def registered_sites() -> List[Site]:
+    return list(_sites_by_url.values())
+
+
+def load_sites(path: str = SITES_FILE, only: Optional[str] = None) -> List[Site]:
+    """Reads the enabled sites of a YAML or JSON site registry.
+
+    `only` (default: AI_NEWS_SITES) is a comma separated list of site types
+    or names used to run a subset, e.g. "reddit" or "hacker_news,wired".
+    """
+    with open(path) as f:
+        if path.endswith(".json"):
+            config = json.load(f)
+        else:
+            config = yaml.safe_load(f)
+    sites = [Site(**entry) for entry in config["sites"]]
+    only = only if only is not None else os.getenv("AI_NEWS_SITES", "")
+    selected = {value.strip() for value in only.split(",") if value.strip()}
+    return [
+        site
+        for site in sites
+        if site.enabled and (not selected or site.type in selected or site.name in selected)
+    ]
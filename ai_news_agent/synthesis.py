@@ -0,0 +1,130 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, AsyncGenerator, List, Union
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import InstructionProvider
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.events import Event, EventActions
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+from .tools.extraction import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+CONDENSE_INSTRUCTION = (
+    "You are a specialist in AI and AI products and models.\n"
+    "Condense the following news items into a markdown list of the most relevant AI news.\n"
+    "Merge items about the same story, keep dates, links and sources. Do not invent items."
+)
+
+
+def batch_lines(lines: List[str], max_chars: int) -> List[str]:
+    """Packs lines, in order, into chunks of at most `max_chars` each.
+
+    A single line longer than `max_chars` gets a chunk of its own.
+    """
+    batches, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            batches.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        batches.append("\n".join(current))
+    return batches
+
+
+class HierarchicalSynthesisAgent(BaseAgent):
+    """Map-reduce synthesis for source sets too large for one prompt.
+
+    The input is split into batches of `batch_tokens`, each batch is condensed
+    concurrently (map), then the condensed lists are merged `fan_in` at a time
+    (reduce) for up to `max_depth` levels. The final call applies
+    `instruction` (a string or, as for LlmAgent, an instruction provider)
+    to what is left. Wall-clock time grows with the depth of the tree
+    rather than with the number of sources. Every call goes through
+    `cache` when given (an llm_cache LlmResponseCache).
+    """
+
+    model: str
+    instruction: Union[str, InstructionProvider]
+    input_key: str = "news_items"
+    output_key: str = "news_digest"
+    batch_tokens: int = 6_000
+    fan_in: int = 4
+    max_depth: int = 2
+    max_concurrency: int = 8
+    cache: Any = None
+
+    async def _generate(self, system_instruction: str, text: str, limit: asyncio.Semaphore) -> str:
+        llm = LLMRegistry.new_llm(self.model)
+        request = LlmRequest(
+            model=self.model,
+            contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+            config=types.GenerateContentConfig(system_instruction=system_instruction),
+        )
+        if self.cache:
+            cached, pending = self.cache.lookup(self.name, request)
+            if cached:
+                return "".join(part.text for part in cached.content.parts if part.text)
+        async with limit:
+            started = time.monotonic()
+            chunks = []
+            async for response in llm.generate_content_async(request):
+                if response.content and response.content.parts:
+                    chunks.extend(part.text for part in response.content.parts if part.text)
+        text = "".join(chunks)
+        if self.cache and text:
+            self.cache.store(
+                self.name,
+                pending,
+                LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)])),
+                time.monotonic() - started,
+            )
+        return text
+
+    async def _condense_all(self, texts: List[str], limit: asyncio.Semaphore) -> List[str]:
+        return list(
+            await asyncio.gather(
+                *(self._generate(CONDENSE_INSTRUCTION, text, limit) for text in texts)
+            )
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        limit = asyncio.Semaphore(self.max_concurrency)
+        items = ctx.session.state.get(self.input_key) or ""
+        parts = batch_lines(items.splitlines(), self.batch_tokens * CHARS_PER_TOKEN)
+        levels = 0
+        if len(parts) > 1:
+            parts = await self._condense_all(parts, limit)
+            levels += 1
+        while len(parts) > self.fan_in and levels < self.max_depth:
+            groups = [
+                "\n".join(parts[i : i + self.fan_in])
+                for i in range(0, len(parts), self.fan_in)
+            ]
+            parts = await self._condense_all(groups, limit)
+            levels += 1
+        logger.info("Synthesis tree: %d level(s), %d final input(s)", levels, len(parts))
+        instruction = self.instruction
+        if not isinstance(instruction, str):
+            instruction = instruction(ReadonlyContext(ctx))
+            if inspect.isawaitable(instruction):
+                instruction = await instruction
+        digest = await self._generate(instruction, "\n".join(parts), limit)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=digest)]),
+            actions=EventActions(state_delta={self.output_key: digest}),
+        )
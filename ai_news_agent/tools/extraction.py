@@ -0,0 +1,112 @@
+import re
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify as md
+
+# Rough Gemini ratio, used to express budgets in tokens when that is handier.
+CHARS_PER_TOKEN = 4
+
+BOILERPLATE_TAGS = [
+    "script", "style", "noscript", "svg", "iframe", "form",
+    "nav", "header", "footer", "aside", "button", "template",
+]
+MIN_HEADLINE_CHARS = 15
+MIN_LINK_ITEMS = 5
+
+Extractor = Callable[[str, str], str]
+
+
+def _clean_soup(html: str) -> BeautifulSoup:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    return soup
+
+
+def _squeeze(markdown: str) -> str:
+    return re.sub(r"\n\s*\n+", "\n\n", markdown).strip()
+
+
+def extract_markdown(html: str, base_url: str) -> str:
+    """The whole page as markdown, the historical behaviour."""
+    return md(html)
+
+
+def extract_main_content(html: str, base_url: str) -> str:
+    """Markdown of the main/article region with the page chrome removed."""
+    soup = _clean_soup(html)
+    main = soup.find("main") or soup.find(attrs={"role": "main"}) or soup.body or soup
+    return _squeeze(md(str(main)))
+
+
+def extract_links(html: str, base_url: str) -> str:
+    """A markdown list of headline links, with dates when the page has them.
+
+    Falls back to the main content when the page yields too few headlines,
+    e.g. because it is rendered client side.
+    """
+    soup = _clean_soup(html)
+    seen = set()
+    items: List[str] = []
+    for anchor in soup.find_all("a", href=True):
+        title = " ".join(anchor.get_text(" ", strip=True).split())
+        href = anchor["href"]
+        if len(title) < MIN_HEADLINE_CHARS or href.startswith(("#", "javascript:", "mailto:")):
+            continue
+        url = urljoin(base_url, href)
+        if url in seen:
+            continue
+        seen.add(url)
+        container = anchor.find_parent(["article", "li", "tr"])
+        time_tag = container.find("time") if container else None
+        date = (time_tag.get("datetime") or time_tag.get_text(strip=True)) if time_tag else ""
+        items.append(f"- {date + ' ' if date else ''}[{title}]({url})")
+    if len(items) < MIN_LINK_ITEMS:
+        return extract_main_content(html, base_url)
+    return "\n".join(items)
+
+
+def extract_trafilatura(html: str, base_url: str) -> str:
+    try:
+        import trafilatura
+    except ImportError:
+        return extract_main_content(html, base_url)
+    text = trafilatura.extract(
+        html, url=base_url, include_links=True, include_comments=False, include_tables=True
+    )
+    return text or extract_main_content(html, base_url)
+
+
+extractors: Dict[str, Extractor] = {
+    "markdownify": extract_markdown,
+    "main_content": extract_main_content,
+    "links": extract_links,
+    "trafilatura": extract_trafilatura,
+}
+
+
+def trim_to_budget(text: str, max_chars: int) -> str:
+    """Cuts `text` to at most `max_chars`, on a line boundary when possible."""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    marker = "\n[truncated]"
+    cut = text[: max(max_chars - len(marker), 0)]
+    newline = cut.rfind("\n")
+    if newline > len(cut) // 2:
+        cut = cut[:newline]
+    return cut + marker
+
+
+def extract(html: str, base_url: str, extractor: str, max_chars: int) -> Tuple[str, Dict[str, int]]:
+    """Runs `extractor` and enforces the budget, returning the text and its sizes."""
+    text = extractors[extractor](html, base_url)
+    trimmed = trim_to_budget(text, max_chars)
+    stats = {
+        "raw_chars": len(html),
+        "extracted_chars": len(text),
+        "final_chars": len(trimmed),
+        "final_tokens_estimate": len(trimmed) // CHARS_PER_TOKEN,
+    }
+    return trimmed, stats
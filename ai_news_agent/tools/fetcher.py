@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import random
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; ai-news-agent/1.0)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncFetcher:
+    """Shared async HTTP client used by the news tools.
+
+    One connection pool is shared by every researcher, requests to the same
+    host are capped by a per-host semaphore and transient failures are retried
+    with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        per_host_limit: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind(self) -> httpx.AsyncClient:
+        # The pool and semaphores belong to one event loop; `adk web` reloads
+        # can hand us a new loop, in which case start over.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+            )
+            self._host_limits = {}
+            self._loop = loop
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        client = self._bind()
+        async with self._host_limit(url):
+            for attempt in range(self.retries + 1):
+                response = None
+                try:
+                    response = await client.get(url, headers=headers, params=params)
+                    if response.status_code not in RETRY_STATUSES:
+                        return response
+                except httpx.TransportError as e:
+                    if attempt == self.retries:
+                        raise
+                    logger.warning("GET %s failed (%s), retrying", url, e)
+                if attempt == self.retries:
+                    return response
+                await asyncio.sleep(self._delay(attempt, response))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+fetcher = AsyncFetcher()
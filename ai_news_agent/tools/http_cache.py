@@ -0,0 +1,169 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from .fetcher import AsyncFetcher, fetcher
+
+CACHE_DIR = os.getenv(
+    "AI_NEWS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai_news_agent")
+)
+MAX_CACHE_BYTES = int(os.getenv("AI_NEWS_HTTP_CACHE_MB", "256")) * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    encoding: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with conditional revalidation.
+
+    Entries live in a single SQLite file. Fresh entries (younger than the TTL)
+    are served without touching the network; stale ones are revalidated with
+    If-None-Match / If-Modified-Since so an unchanged page costs a 304. The
+    total body size is bounded and the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = MAX_CACHE_BYTES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, body BLOB, encoding TEXT, etag TEXT,"
+            " last_modified TEXT, fetched_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._db.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, encoding, etag, last_modified, fetched_at"
+                " FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url)
+            )
+            self._db.commit()
+        return CachedResponse(url, *row, from_cache=True)
+
+    def put(self, entry: CachedResponse):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.url,
+                    entry.body,
+                    entry.encoding,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.fetched_at,
+                    now,
+                    len(entry.body),
+                ),
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, url: str, fetched_at: float):
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?",
+                (fetched_at, fetched_at, url),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT url, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+
+
+def _cache_key(url: str, params: Optional[Dict[str, str]]) -> str:
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+async def cached_get(
+    url: str,
+    ttl: int,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, str]] = None,
+    cache: Optional[ResponseCache] = None,
+    client: AsyncFetcher = fetcher,
+) -> CachedResponse:
+    """GETs `url`, serving it from the cache while younger than `ttl` seconds.
+
+    Raises httpx.HTTPStatusError for error responses, like raise_for_status.
+    """
+    cache = cache or response_cache
+    key = _cache_key(url, params)
+    # SQLite reads and writes run off the event loop, like the extraction.
+    entry = await asyncio.to_thread(cache.get, key)
+    now = time.time()
+    if entry is not None and now - entry.fetched_at < ttl:
+        return entry
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            request_headers["If-Modified-Since"] = entry.last_modified
+
+    response = await client.get(url, headers=request_headers, params=params)
+    if response.status_code == 304 and entry is not None:
+        await asyncio.to_thread(cache.refresh, key, now)
+        entry.fetched_at = now
+        return entry
+    response.raise_for_status()
+
+    entry = CachedResponse(
+        url=key,
+        body=response.content,
+        encoding=response.encoding or "utf-8",
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        fetched_at=now,
+    )
+    await asyncio.to_thread(cache.put, entry)
+    return entry
+
+
+response_cache = ResponseCache(os.path.join(CACHE_DIR, "http_cache.sqlite3"))
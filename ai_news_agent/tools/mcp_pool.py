@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from google.adk.tools.mcp_tool.mcp_toolset import (
+    MCPToolset,
+    SseConnectionParams,
+    StdioConnectionParams,
+    StdioServerParameters,
+    StreamableHTTPConnectionParams,
+)
+
+from .http_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Local installs live here, see `python -m ai_news_agent.tools.mcp_pool install`.
+MCP_DIR = os.getenv("AI_NEWS_MCP_DIR", os.path.join(CACHE_DIR, "mcp"))
+PLAYWRIGHT_MCP_VERSION = os.getenv("PLAYWRIGHT_MCP_VERSION", "0.0.32")
+REDDIT_MCP_REPO = "git+https://github.com/adhikasp/mcp-reddit.git"
+# A tag or commit SHA of REDDIT_MCP_REPO. There is no default on purpose: a
+# branch would run whatever was pushed last.
+REDDIT_MCP_REF = os.getenv("REDDIT_MCP_REF")
+
+
+@dataclass
+class McpServer:
+    """How to reach one MCP server.
+
+    `url_env` names an environment variable that, when set, points at an
+    already running server (streamable HTTP, or SSE for urls ending in /sse),
+    e.g. a long-lived shared instance or a local stub in tests. Otherwise the
+    pinned local binary is started over stdio, falling back to `command`,
+    which needs the version pinned through `pin_env` when it is set.
+    Without any of them `connection_params` raises ValueError, and the
+    researchers using the server are left out of the run.
+    """
+
+    name: str
+    command: str
+    args: List[str]
+    url_env: str
+    local_bin: Optional[str] = None
+    local_args: List[str] = field(default_factory=list)
+    timeout: float = 20
+    pin_env: Optional[str] = None
+
+    def connection_params(self):
+        url = os.getenv(self.url_env)
+        if url:
+            if url.rstrip("/").endswith("/sse"):
+                return SseConnectionParams(url=url, timeout=self.timeout)
+            return StreamableHTTPConnectionParams(url=url, timeout=self.timeout)
+        if self.local_bin and os.path.exists(self.local_bin):
+            command, args = self.local_bin, self.local_args
+        elif self.pin_env and not os.getenv(self.pin_env):
+            raise ValueError(
+                f"Set {self.pin_env} to a tag or commit SHA of the {self.name} MCP server,"
+                f" or {self.url_env} to a running one"
+            )
+        else:
+            command, args = self.command, self.args
+        return StdioConnectionParams(
+            server_params=StdioServerParameters(command=command, args=args),
+            timeout=self.timeout,
+        )
+
+
+SERVERS = {
+    "playwright": McpServer(
+        name="playwright",
+        command="npx",
+        args=["-y", f"@playwright/mcp@{PLAYWRIGHT_MCP_VERSION}", "--headless"],
+        url_env="PLAYWRIGHT_MCP_URL",
+        local_bin=os.path.join(MCP_DIR, "node_modules", ".bin", "mcp-server-playwright"),
+        local_args=["--headless"],
+    ),
+    "reddit": McpServer(
+        name="reddit",
+        command="uvx",
+        args=["--from", f"{REDDIT_MCP_REPO}@{REDDIT_MCP_REF}", "mcp-reddit"],
+        url_env="REDDIT_MCP_URL",
+        local_bin=shutil.which("mcp-reddit"),
+        pin_env="REDDIT_MCP_REF",
+    ),
+}
+
+
+class McpServerPool:
+    """One long-lived MCPToolset per MCP server, shared by every researcher.
+
+    The toolset keeps its server session open between calls and between
+    pipeline runs, so the server process starts once per worker instead of
+    once per researcher. `warm_up` starts every toolset in use concurrently
+    and doubles as a health check: a server that does not answer in time is
+    closed so its session is recreated on next use.
+    """
+
+    def __init__(self, servers: Dict[str, McpServer]):
+        self.servers = servers
+        self._toolsets: Dict[str, MCPToolset] = {}
+
+    def toolset(self, name: str) -> MCPToolset:
+        if name not in self._toolsets:
+            self._toolsets[name] = MCPToolset(
+                connection_params=self.servers[name].connection_params()
+            )
+        return self._toolsets[name]
+
+    async def check(self, name: str) -> bool:
+        toolset = self._toolsets[name]
+        try:
+            await asyncio.wait_for(toolset.get_tools(), self.servers[name].timeout)
+            return True
+        except Exception as e:
+            logger.warning("MCP server %s is unhealthy (%s), restarting it", name, e)
+            await toolset.close()
+            return False
+
+    async def warm_up(self) -> Dict[str, bool]:
+        names = list(self._toolsets)
+        results = await asyncio.gather(*(self.check(name) for name in names))
+        return dict(zip(names, results))
+
+    async def close(self):
+        for toolset in self._toolsets.values():
+            await toolset.close()
+
+
+mcp_pool = McpServerPool(SERVERS)
+
+
+def install():
+    """Installs the pinned MCP servers locally so no run resolves packages."""
+    if not REDDIT_MCP_REF:
+        sys.exit("Set REDDIT_MCP_REF to the tag or commit SHA of mcp-reddit to install")
+    os.makedirs(MCP_DIR, exist_ok=True)
+    subprocess.run(
+        ["npm", "install", "--prefix", MCP_DIR, f"@playwright/mcp@{PLAYWRIGHT_MCP_VERSION}"],
+        check=True,
+    )
+    subprocess.run(
+        ["uv", "tool", "install", "--force", f"{REDDIT_MCP_REPO}@{REDDIT_MCP_REF}"],
+        check=True,
+    )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["install"]:
+        install()
+    else:
+        print("usage: python -m ai_news_agent.tools.mcp_pool install")
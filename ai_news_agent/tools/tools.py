@@ -1,54 +1,64 @@
-import os
-import requests
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
 
+import httpx
 from google.adk.tools.function_tool import FunctionTool, ToolContext
-from markdownify import markdownify as md
-from google.adk.tools.mcp_tool.mcp_toolset import (
-    MCPToolset,
-    StdioConnectionParams,
-    StdioServerParameters,
-)
-
-playwright_mcp_tool = MCPToolset(
-    connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(
-            command="npx",
-            args=[
-                "-y",  # Argument for npx to auto-confirm install
-                "@playwright/mcp@latest",
-                "--headless",
-            ],
-        ),
-        timeout=20,
-    ),
-)
-
-reddit_mcp_tool = MCPToolset(
-    connection_params=StdioServerParameters(
-        command="uvx",
-        args=["--from", "git+https://github.com/adhikasp/mcp-reddit.git", "mcp-reddit"],
-        # Optional: Add environment variables if needed by the MCP server,
-        # e.g., credentials if mcp-reddit required them.
-        # env=os.environ.copy()
-        timeout=20,
-    )
-)
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+
+from ..dedup import PENDING_WATERMARK_PREFIX, drop_seen_items
+from ..seen_store import is_incremental, seen_store
+from ..sites import Site, get_site
+from .extraction import extract, trim_to_budget
+from .http_cache import cached_get
+from .mcp_pool import mcp_pool
+from .twitter import fetch_community_tweets, render_tweets
+
+logger = logging.getLogger(__name__)
+
+
+# Toolsets are built on first use, only when a site of that type is enabled,
+# and shared through the MCP server pool.
+def get_playwright_mcp_tool() -> MCPToolset:
+    return mcp_pool.toolset("playwright")
+
+
+def get_reddit_mcp_tool() -> MCPToolset:
+    return mcp_pool.toolset("reddit")
+
 
 # computer_use_toolset = ComputerUseToolset(
 #     computer=BaseComputer()
 # )
 
-def get_news_from_url(tool_context: ToolContext, url: str, state_key: str):
+
+def _site_for(url: str, state_key: str) -> Site:
+    # Unknown urls (e.g. typed by the model) get the defaults.
+    return get_site(url) or Site(name=url, url=url, result_key=state_key)
+
+
+async def fetch_news(site: Site, skip_seen: bool = False) -> Tuple[str, Dict[str, int]]:
+    """Fetches a site and reduces it to its news items, within the site budget.
+
+    With `skip_seen`, items already published by an earlier digest are removed.
+    """
+    html = (await cached_get(site.url, ttl=site.ttl)).text
+    markdown, stats = await asyncio.to_thread(
+        extract, html, site.url, site.extractor, site.max_chars
+    )
+    if skip_seen:
+        markdown = drop_seen_items(markdown, seen_store)
+        stats["new_chars"] = len(markdown)
+    logger.info("%s: %s", site.name, stats)
+    return markdown, stats
+
+
+async def get_news_from_url(tool_context: ToolContext, url: str, state_key: str):
     try:
         #tool_context.actions.skip_summarization = True
-        html = requests.get(url).text
-
-        # Extract main content
-        # text_content = trafilatura.extract(html, include_links=True, include_comments=False, include_tables=True)
-        markdown = md(html)
-        # Convert to Markdown
-        # markdown = html2text.html2text(text_content)
-        # tool_context.state[state_key] = markdown
+        site = _site_for(url, state_key)
+        markdown, stats = await fetch_news(site, skip_seen=is_incremental(tool_context.state))
+        tool_context.state[f"{site.result_key}_stats"] = stats
         return markdown
     except Exception as e:
         print(f"Error getting news from {url}: {e}")
@@ -58,27 +68,50 @@ def get_news_from_url(tool_context: ToolContext, url: str, state_key: str):
 get_news_from_url_tool = FunctionTool(get_news_from_url)
 
 
-def get_community_tweets(tool_context: ToolContext, community_id: str, state_key: str):
-    # tool_context.actions.skip_summarization = True
-    api_key = os.getenv("TWITTERAPI_API_KEY")  # Replace with your actual API key
-    url = f"https://api.twitterapi.io/twitter/community/tweets?community_id={community_id}"
-
-    headers = {
-        "X-API-Key": api_key,
-        "Accept": "application/json",
-    }
-    print("="*42)
-    print(f"Getting community tweets for {url}")
-    print(f"Headers: {headers}")
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
+async def fetch_tweets(
+    site: Site, skip_seen: bool = False, pending: Optional[Dict[str, str]] = None
+) -> Tuple[List[dict], Dict[str, int]]:
+    """Compact tweets of a community, only those newer than the last run with `skip_seen`.
 
-        community_info = response.json()
-        return community_info
+    The newest tweet id goes into `pending` as a state entry; `mark_published`
+    only moves the watermark once the digest is out.
+    """
+    watermark = f"twitter:{site.url}"
+    since_id = seen_store.get_watermark(watermark) if skip_seen else None
+    tweets, newest_id = await fetch_community_tweets(site.url, ttl=site.ttl, since_id=since_id)
+    if skip_seen and newest_id and pending is not None:
+        pending[PENDING_WATERMARK_PREFIX + watermark] = newest_id
+    stats = {"tweets": len(tweets)}
+    logger.info("%s: %s", site.name, stats)
+    return tweets, stats
 
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred: {e}")
+
+async def fetch_source(
+    site: Site, skip_seen: bool = False, pending: Optional[Dict[str, str]] = None
+) -> Tuple[str, Dict[str, int]]:
+    """A site's news as markdown, whatever its type (fetch or twitter)."""
+    if site.type == "twitter":
+        tweets, stats = await fetch_tweets(site, skip_seen, pending)
+        markdown = trim_to_budget(render_tweets(tweets), site.max_chars)
+        stats["final_chars"] = len(markdown)
+        return markdown, stats
+    return await fetch_news(site, skip_seen)
+
+
+async def get_community_tweets(tool_context: ToolContext, community_id: str, state_key: str):
+    # tool_context.actions.skip_summarization = True
+    try:
+        site = _site_for(community_id, state_key)
+        pending: Dict[str, str] = {}
+        tweets, stats = await fetch_tweets(
+            site, skip_seen=is_incremental(tool_context.state), pending=pending
+        )
+        tool_context.state.update(pending)
+        tool_context.state[f"{site.result_key}_stats"] = stats
+        return {"tweets": tweets}
+    except httpx.HTTPError as e:
+        logger.warning("Error getting tweets of community %s: %s", community_id, e)
+        return {"error": f"Error getting tweets of community {community_id}: {e}"}
 
 
-get_community_tweets_tool = FunctionTool(get_community_tweets)
\ No newline at end of file
+get_community_tweets_tool = FunctionTool(get_community_tweets)
@@ -0,0 +1,88 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .http_cache import cached_get
+
+COMMUNITY_TWEETS_URL = "https://api.twitterapi.io/twitter/community/tweets"
+MAX_TWEETS = int(os.getenv("TWITTER_MAX_TWEETS", "100"))
+MAX_PAGES = 10
+# Matches the 3 day window of the news prompts.
+MAX_AGE = timedelta(hours=int(os.getenv("TWITTER_MAX_AGE_HOURS", "72")))
+
+
+def _created_at(tweet: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(tweet["createdAt"], "%a %b %d %H:%M:%S %z %Y")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def project_tweet(tweet: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a twitterapi.io tweet worth sending to the model."""
+    created_at = _created_at(tweet)
+    author = (tweet.get("author") or {}).get("userName")
+    return {
+        "id": tweet.get("id"),
+        "author": author,
+        "time": created_at.isoformat() if created_at else tweet.get("createdAt"),
+        "text": tweet.get("text"),
+        "url": tweet.get("url")
+        or tweet.get("twitterUrl")
+        or f"https://x.com/{author or 'i'}/status/{tweet.get('id')}",
+        "likes": tweet.get("likeCount", 0),
+        "retweets": tweet.get("retweetCount", 0),
+        "replies": tweet.get("replyCount", 0),
+        "views": tweet.get("viewCount", 0),
+    }
+
+
+async def fetch_community_tweets(
+    community_id: str,
+    ttl: int,
+    since_id: Optional[str] = None,
+    max_tweets: int = MAX_TWEETS,
+    max_age: timedelta = MAX_AGE,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Pages through a community feed, newest first, and projects each tweet.
+
+    Stops at `max_tweets`, at tweets older than `max_age` or at `since_id`,
+    the newest tweet of an earlier run. Returns the tweets and the id of the
+    newest one, to be used as the next `since_id`.
+    """
+    headers = {"X-API-Key": os.getenv("TWITTERAPI_API_KEY", ""), "Accept": "application/json"}
+    oldest = datetime.now(timezone.utc) - max_age
+    tweets: List[Dict[str, Any]] = []
+    newest_id = since_id
+    cursor = ""
+    for _ in range(MAX_PAGES):
+        params = {"community_id": community_id}
+        if cursor:
+            params["cursor"] = cursor
+        page = (
+            await cached_get(COMMUNITY_TWEETS_URL, ttl=ttl, headers=headers, params=params)
+        ).json()
+        for tweet in page.get("tweets") or []:
+            tweet_id = str(tweet.get("id", ""))
+            created_at = _created_at(tweet)
+            if since_id and tweet_id.isdigit() and int(tweet_id) <= int(since_id):
+                return tweets, newest_id
+            if created_at and created_at < oldest:
+                return tweets, newest_id
+            if tweet_id.isdigit() and (not newest_id or int(tweet_id) > int(newest_id)):
+                newest_id = tweet_id
+            tweets.append(project_tweet(tweet))
+            if len(tweets) >= max_tweets:
+                return tweets, newest_id
+        cursor = page.get("next_cursor") or ""
+        if not page.get("has_next_page") or not cursor:
+            break
+    return tweets, newest_id
+
+
+def render_tweets(tweets: List[Dict[str, Any]]) -> str:
+    return "\n".join(
+        f"- {tweet['time']} @{tweet['author']}: {' '.join((tweet['text'] or '').split())}"
+        f" [tweet]({tweet['url']}) ({tweet['likes']} likes, {tweet['retweets']} retweets)"
+        for tweet in tweets
+    )
@@ -1,14 +1,26 @@
 # Conceptual Code: Coordinator using LLM Transfer
 from google.adk.agents import LlmAgent
 
+try:
+    from llm_cache import model_callbacks
+except ImportError:  # Deployed without the llm_cache package.
+    def model_callbacks(agent, *before, ttl=None):
+        return {"before_model_callback": list(before), "after_model_callback": []}
+
+from .router import Router
+
 billing_agent = LlmAgent(name="Billing", description="Handles billing inquiries.")
 support_agent = LlmAgent(name="Support", description="Handles technical support requests.")
 
+# Routes clear-cut requests without the model, see router.py for the offline eval.
+router = Router.from_agents([billing_agent, support_agent])
+
 root_agent = LlmAgent(
     name="HelpDeskCoordinator",
     model="gemini-2.0-flash",
     instruction="Route user requests: Use Billing agent for payment issues, Support agent for technical problems.",
     description="Main help desk router.",
+    **model_callbacks("HelpDeskCoordinator", router.before_model_callback),
     # allow_transfer=True is often implicit with sub_agents in AutoFlow
     sub_agents=[billing_agent, support_agent]
 )
\ No newline at end of file
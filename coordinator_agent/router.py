@@ -0,0 +1,173 @@
+import json
+import logging
+import math
+import os
+import re
+import statistics
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+EXAMPLES_FILE = os.getenv(
+    "COORDINATOR_ROUTING_EXAMPLES",
+    os.path.join(os.path.dirname(__file__), "routing_examples.json"),
+)
+# A request is routed locally when its best agent scores at least MIN_SCORE
+# and beats the runner-up by MIN_MARGIN, otherwise the model decides.
+MIN_SCORE = float(os.getenv("COORDINATOR_ROUTER_MIN_SCORE", "0.12"))
+MIN_MARGIN = float(os.getenv("COORDINATOR_ROUTER_MIN_MARGIN", "0.08"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "be", "can", "do", "does", "for", "from", "how",
+    "i", "if", "in", "is", "it", "me", "my", "of", "on", "or", "the", "there",
+    "this", "to", "use", "was", "what", "when", "where", "why", "with", "you",
+}
+
+Vector = Dict[str, float]
+
+
+def tokens(text: str) -> List[str]:
+    words = [
+        word[:-1] if len(word) > 3 and word.endswith("s") else word
+        for word in re.findall(r"[a-z0-9]+", text.lower())
+        if word not in STOPWORDS
+    ]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def _normalized(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+    return {term: value / norm for term, value in vector.items()}
+
+
+def load_examples(path: str = EXAMPLES_FILE) -> Dict[str, List[str]]:
+    """Labelled requests, {"<agent name>": ["request", ...]}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class Router:
+    """TF-IDF nearest-centroid classifier over the sub agents.
+
+    Each agent is described by its `description` and its labelled examples.
+    `route` returns the agent name when confident, None otherwise.
+    """
+
+    def __init__(self, documents: Dict[str, List[str]], min_score: float = MIN_SCORE, min_margin: float = MIN_MARGIN):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        all_docs = [Counter(tokens(doc)) for docs in documents.values() for doc in docs]
+        document_frequency = Counter(term for doc in all_docs for term in doc)
+        self.idf = {
+            term: math.log((1 + len(all_docs)) / (1 + count)) + 1
+            for term, count in document_frequency.items()
+        }
+        self.centroids: Dict[str, Vector] = {}
+        for label, docs in documents.items():
+            centroid: Vector = Counter()
+            for doc in docs:
+                for term, value in self.vector(doc).items():
+                    centroid[term] += value
+            self.centroids[label] = _normalized(centroid)
+
+    @classmethod
+    def from_agents(cls, agents: Iterable, examples: Optional[Dict[str, List[str]]] = None, **kwargs) -> "Router":
+        examples = examples if examples is not None else load_examples()
+        return cls(
+            {agent.name: [agent.description or "", *examples.get(agent.name, [])] for agent in agents},
+            **kwargs,
+        )
+
+    def vector(self, text: str) -> Vector:
+        counts = Counter(term for term in tokens(text) if term in self.idf)
+        return _normalized({term: count * self.idf[term] for term, count in counts.items()})
+
+    def scores(self, text: str) -> List[Tuple[float, str]]:
+        query = self.vector(text)
+        return sorted(
+            (
+                (sum(value * centroid.get(term, 0.0) for term, value in query.items()), label)
+                for label, centroid in self.centroids.items()
+            ),
+            reverse=True,
+        )
+
+    def route(self, text: str) -> Optional[str]:
+        ranked = self.scores(text)
+        if not ranked:
+            return None
+        best_score, best = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if best_score >= self.min_score and best_score - runner_up >= self.min_margin:
+            return best
+        return None
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Answers with a transfer_to_agent call when the new user message is clear enough."""
+        if not llm_request.contents or llm_request.contents[-1].role != "user":
+            return None
+        parts = llm_request.contents[-1].parts or []
+        text = " ".join(part.text for part in parts if part.text)
+        if not text or any(part.function_response for part in parts):
+            return None
+        agent_name = self.route(text)
+        if agent_name is None:
+            return None
+        logger.info("Routed to %s without the model", agent_name)
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(function_call=types.FunctionCall(
+                    name="transfer_to_agent", args={"agent_name": agent_name}
+                ))],
+            )
+        )
+
+
+def evaluate(agents: Iterable, examples: Dict[str, List[str]], **kwargs) -> Dict[str, float]:
+    """Leave-one-out evaluation of the router on the labelled examples.
+
+    Coverage is the share of requests routed locally, accuracy is measured on
+    those; the others would go to the model.
+    """
+    agents = list(agents)
+    routed = correct = 0
+    latencies = []
+    samples = [(label, i) for label, texts in examples.items() for i in range(len(texts))]
+    for label, i in samples:
+        held_out = {name: texts[:i] + texts[i + 1:] if name == label else texts for name, texts in examples.items()}
+        router = Router.from_agents(agents, held_out, **kwargs)
+        started = time.perf_counter()
+        predicted = router.route(examples[label][i])
+        latencies.append(time.perf_counter() - started)
+        if predicted is not None:
+            routed += 1
+            correct += predicted == label
+    return {
+        "examples": len(samples),
+        "coverage": routed / len(samples) if samples else 0.0,
+        "accuracy": correct / routed if routed else 0.0,
+        "mean_latency_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+        "max_latency_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    # python -m coordinator_agent.router [examples.json]
+    import sys
+
+    from .agent import root_agent
+
+    path = sys.argv[1] if len(sys.argv) > 1 else EXAMPLES_FILE
+    for metric, value in evaluate(root_agent.sub_agents, load_examples(path)).items():
+        print(f"{metric}: {value:.3f}" if isinstance(value, float) else f"{metric}: {value}")
@@ -0,0 +1,133 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+import yaml
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LLMRegistry
+from google.adk.tools import BaseTool
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+class AgentSpec(BaseModel):
+    name: str
+    model: str
+    description: str
+    instruction: str
+    tools: Optional[List[str]] = None
+    sub_agents: Optional[List[str]] = None
+
+
+def load_specs(directory: str) -> List[AgentSpec]:
+    """Reads every JSON or YAML spec of a directory, one spec or a list per file."""
+    specs = []
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        if not path.endswith((".json", ".yaml", ".yml")):
+            continue
+        with open(path) as f:
+            config = json.load(f) if path.endswith(".json") else yaml.safe_load(f)
+        for entry in config if isinstance(config, list) else [config]:
+            specs.append(AgentSpec(**entry))
+    return specs
+
+
+class AgentFactory:
+    """Builds agents from specs, resolving tools and sub_agents by name.
+
+    Sub agents are other registered specs. Built agent trees are memoized in
+    an LRU keyed by a hash of the spec and of all its sub agent specs, so a
+    spec is only built again once it, or one of its sub agents, changes.
+    Cached agents are shared: do not attach them as sub agents elsewhere, an
+    ADK agent can only have one parent.
+    """
+
+    def __init__(self, tool_map: Dict[str, BaseTool], max_size: int = 128):
+        self.tool_map = tool_map
+        self.max_size = max_size
+        self.specs: Dict[str, AgentSpec] = {}
+        self._agents: "OrderedDict[str, Agent]" = OrderedDict()
+        self._models: Dict[str, BaseLlm] = {}
+
+    def register(self, spec: AgentSpec):
+        self.specs[spec.name] = spec
+
+    def validate(self, spec: AgentSpec, path: tuple = ()):
+        """Checks a spec and its sub agents, raising ValueError on the first problem."""
+        if not spec.name.isidentifier():
+            raise ValueError(f"Agent name {spec.name!r} is not a valid identifier")
+        if spec.name in path:
+            raise ValueError(f"Cycle in sub_agents: {' -> '.join(path + (spec.name,))}")
+        unknown_tools = [tool for tool in spec.tools or [] if tool not in self.tool_map]
+        if unknown_tools:
+            raise ValueError(f"Agent {spec.name} uses unknown tools: {', '.join(unknown_tools)}")
+        for name in spec.sub_agents or []:
+            if name not in self.specs:
+                raise ValueError(f"Agent {spec.name} uses unknown sub agent {name}")
+            self.validate(self.specs[name], path + (spec.name,))
+
+    def spec_hash(self, spec: AgentSpec) -> str:
+        """Content hash of a spec and, recursively, of its sub agents."""
+        content = spec.model_dump_json() + "".join(
+            self.spec_hash(self.specs[name]) for name in spec.sub_agents or []
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def model(self, name: str) -> BaseLlm:
+        """One model object, and so one API client, per model name for all agents."""
+        if name not in self._models:
+            self._models[name] = LLMRegistry.new_llm(name)
+        return self._models[name]
+
+    def _build(self, spec: AgentSpec) -> Agent:
+        # Sub agents are built anew for every parent, never taken from the cache.
+        return Agent(
+            name=spec.name,
+            model=self.model(spec.model),
+            description=spec.description,
+            instruction=spec.instruction,
+            tools=[self.tool_map[tool] for tool in spec.tools or []],
+            sub_agents=[self._build(self.specs[name]) for name in spec.sub_agents or []],
+        )
+
+    def build(self, spec: Union[AgentSpec, str]) -> Agent:
+        """The agent of a spec, or of a registered spec name, built at most once."""
+        if isinstance(spec, AgentSpec):
+            self.register(spec)
+        else:
+            spec = self.specs[spec]
+        self.validate(spec)
+        key = self.spec_hash(spec)
+        if key in self._agents:
+            self._agents.move_to_end(key)
+            return self._agents[key]
+        agent = self._build(spec)
+        self._agents[key] = agent
+        while len(self._agents) > self.max_size:
+            self._agents.popitem(last=False)
+        return agent
+
+    def warm_up(self, directory: str) -> List[Agent]:
+        """Registers the specs of a directory, then builds the valid ones.
+
+        Warming up is best effort: unreadable directories and invalid specs
+        are logged and skipped, they fail again when actually requested.
+        """
+        try:
+            specs = load_specs(directory)
+        except Exception:
+            logger.exception("Could not load the specs of %s, skipping warm up", directory)
+            return []
+        for spec in specs:
+            self.register(spec)
+        agents = []
+        for spec in specs:
+            try:
+                agents.append(self.build(spec.name))
+            except ValueError:
+                logger.exception("Skipping invalid spec %s", spec.name)
+        return agents
@@ -4,12 +4,14 @@ from vertexai.preview import reasoning_engines
 from google.adk.agents import Agent
 from google.adk.tools import FunctionTool, ToolContext
 from google.genai import Client, types
-from pydantic import BaseModel
-from typing import List
-from typing import Optional
+import asyncio
+import functools
+import os
 import uuid
 import time
 
+from factory import AgentFactory, AgentSpec
+
 
 MODEL = "gemini-2.5-flash"
 MODEL_IMAGE = "imagen-4.0-fast-generate-preview-06-06"
@@ -19,32 +21,49 @@ PROJECT_ID = "svc-demo-vertex"
 LOCATION = "us-central1"
 STAGING_BUCKET = "gs://svc-demo-vertex-us"
 
-class AgentSpec(BaseModel):
-    name: str
-    model: str
-    description: str
-    instruction: str
-    tools: Optional[List[str]] = None
-    sub_agents: Optional[List[str]] = None
+# Concurrent requests per model, sized to the project's quota.
+MODEL_CONCURRENCY = {
+    MODEL_IMAGE: 4,
+    MODEL_VIDEO: 2,
+}
+
+_model_limits = {}
+_loop = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(project: str, location: str) -> Client:
+    """Process-wide client for a project and location, built once and shared."""
+    return Client(vertexai=True, project=project, location=location)
+
+
+def model_limit(model: str) -> asyncio.Semaphore:
+    """Caps the requests in flight to `model` across every session."""
+    global _loop
+    # Semaphores belong to one event loop, start over when it changes.
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _model_limits.clear()
+        _loop = loop
+    if model not in _model_limits:
+        _model_limits[model] = asyncio.Semaphore(MODEL_CONCURRENCY.get(model, 4))
+    return _model_limits[model]
 
 
 async def generate_image(tool_context: "ToolContext", img_prompt: str, aspect_ratio: str = "16:9"):
     """Generates an image based on the prompt."""
-    client = Client(
-        vertexai=True,
-        project=PROJECT_ID,
-        location=LOCATION,
-    )
+    client = get_client(PROJECT_ID, LOCATION)
     print("#"*27)
     print(img_prompt)
-    response = client.models.generate_images(
-        model=MODEL_IMAGE,
-        prompt=img_prompt,
-        config=types.GenerateImagesConfig(
-            number_of_images=1, 
-            aspect_ratio=aspect_ratio, 
-            enhance_prompt=True),
-    )
+    async with model_limit(MODEL_IMAGE):
+        response = await client.aio.models.generate_images(
+            model=MODEL_IMAGE,
+            prompt=img_prompt,
+            config=types.GenerateImagesConfig(
+                number_of_images=1, 
+                aspect_ratio=aspect_ratio, 
+                enhance_prompt=True),
+        )
     if not response.generated_images:
         return {"status": "failed"}
     image_bytes = response.generated_images[0].image.image_bytes
@@ -66,19 +85,16 @@ async def generate_image(tool_context: "ToolContext", img_prompt: str, aspect_ra
 
 async def modify_image(tool_context: "ToolContext", img_prompt: str, image_filename: str, aspect_ratio: str = "16:9"):
     """Modify an image based on the modified prompt."""
-    client = Client(
-        vertexai=True,
-        project=PROJECT_ID,
-        location=LOCATION,
-    )
-    response = client.models.generate_images(
-        model=MODEL_IMAGE,
-        prompt=img_prompt,
-        config=types.GenerateImagesConfig(
-            number_of_images=1, 
-            aspect_ratio=aspect_ratio, 
-            enhance_prompt=True),
-    )
+    client = get_client(PROJECT_ID, LOCATION)
+    async with model_limit(MODEL_IMAGE):
+        response = await client.aio.models.generate_images(
+            model=MODEL_IMAGE,
+            prompt=img_prompt,
+            config=types.GenerateImagesConfig(
+                number_of_images=1, 
+                aspect_ratio=aspect_ratio, 
+                enhance_prompt=True),
+        )
     if not response.generated_images:
         return {"status": "failed"}
     image_bytes = response.generated_images[0].image.image_bytes
@@ -97,13 +113,51 @@ async def modify_image(tool_context: "ToolContext", img_prompt: str, image_filen
         "filename": image_filename,
     }
 
-async def generate_video(tool_context: "ToolContext", video_prompt: str, image_filename: str, aspect_ratio: str = "16:9"):
-    """Generates a video based on the prompt and image."""
-    client = Client(
-        vertexai=True,
-        project=PROJECT_ID,
-        location=LOCATION,
+async def _wait_for_operation(client: Client, operation, initial_delay: float = 5, max_delay: float = 30, timeout: float = 600):
+    """Polls a long-running operation without blocking the event loop."""
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    while not operation.done:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Operation {operation.name} did not finish in {timeout}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+        operation = await client.aio.operations.get(operation)
+    return operation
+
+
+# State key of the videos saved so far, {job_id: filename}.
+VIDEO_JOBS_KEY = "video_jobs"
+
+
+async def _save_video(tool_context: "ToolContext", operation):
+    if not operation.result or not operation.result.generated_videos:
+        return {"status": "failed"}
+    video_bytes = operation.result.generated_videos[0].video.video_bytes
+    filename = f"generated_video_{uuid.uuid4()}.mp4" 
+    version = await tool_context.save_artifact(
+        filename,
+        types.Part.from_bytes(data=video_bytes, mime_type="video/mp4"),
     )
+    print(f"Video saved with version: {version}")
+    if operation.name:
+        tool_context.state[VIDEO_JOBS_KEY] = {
+            **(tool_context.state.get(VIDEO_JOBS_KEY) or {}), operation.name: filename
+        }
+    return {
+        "status": "success",
+        "detail": "Video generated successfully and stored in artifacts.",
+        "filename": filename,
+    }
+
+
+async def generate_video(tool_context: "ToolContext", video_prompt: str, image_filename: str, aspect_ratio: str = "16:9", wait_for_completion: bool = True):
+    """Generates a video based on the prompt and image.
+
+    With wait_for_completion=False, returns a job_id right away; use
+    check_video_status with it to get the video once it is ready.
+    """
+    client = get_client(PROJECT_ID, LOCATION)
     image_artifact = await tool_context.load_artifact(image_filename)
     if image_artifact and image_artifact.inline_data:
         print(f"Successfully loaded latest Python artifact '{image_filename}'.")
@@ -112,34 +166,30 @@ async def generate_video(tool_context: "ToolContext", video_prompt: str, image_f
         image_bytes = image_artifact.inline_data.data
         print(f"Report size: {len(image_bytes)} bytes.")
         # ... further processing ...
-        operation = client.models.generate_videos(
-            model=MODEL_VIDEO,
-            prompt=video_prompt,
-            image=types.Image(image_bytes=image_bytes, mime_type="image/png"),
-            config={
-                "number_of_videos": 1,
-                "aspect_ratio": aspect_ratio,
-            },
-        )
-
-        while not operation.done:
-            time.sleep(5)
-            operation = client.operations.get(operation)
-
-        if not operation.result.generated_videos:
-            return {"status": "failed"}
-        video_bytes = operation.result.generated_videos[0].video.video_bytes
-        filename = f"generated_video_{uuid.uuid4()}.mp4" 
-        version = await tool_context.save_artifact(
-            filename,
-            types.Part.from_bytes(data=video_bytes, mime_type="video/mp4"),
-        )
-        print(f"Video saved with version: {version}")
-        return {
-            "status": "success",
-            "detail": "Video generated successfully and stored in artifacts.",
-            "filename": filename,
+        async with model_limit(MODEL_VIDEO):
+            operation = await client.aio.models.generate_videos(
+                model=MODEL_VIDEO,
+                prompt=video_prompt,
+                image=types.Image(image_bytes=image_bytes, mime_type="image/png"),
+                config={
+                    "number_of_videos": 1,
+                    "aspect_ratio": aspect_ratio,
+                },
+            )
+        pending = {
+            "status": "pending",
+            "detail": "Video generation started, check on it with check_video_status.",
+            "job_id": operation.name,
         }
+        if not wait_for_completion:
+            return pending
+
+        try:
+            operation = await _wait_for_operation(client, operation)
+        except TimeoutError:
+            # The job keeps running, check_video_status picks it up from here.
+            return pending
+        return await _save_video(tool_context, operation)
     else:
         print(f"Python artifact '{image_filename}' not found.")
         return {
@@ -148,20 +198,39 @@ async def generate_video(tool_context: "ToolContext", video_prompt: str, image_f
         }
 
 
+async def check_video_status(tool_context: "ToolContext", job_id: str):
+    """Checks a video job started by generate_video and stores the video once done."""
+    filename = (tool_context.state.get(VIDEO_JOBS_KEY) or {}).get(job_id)
+    if filename:
+        return {
+            "status": "success",
+            "detail": "Video already stored in artifacts.",
+            "filename": filename,
+        }
+    client = get_client(PROJECT_ID, LOCATION)
+    operation = await client.aio.operations.get(types.GenerateVideosOperation(name=job_id))
+    if not operation.done:
+        return {"status": "pending", "detail": "The video is not ready yet.", "job_id": job_id}
+    if operation.error:
+        return {"status": "failed", "detail": str(operation.error)}
+    return await _save_video(tool_context, operation)
+
+
 tool_map = {
     "generate_image": FunctionTool(func=generate_image),
-    "generate_video": FunctionTool(func=generate_video)
+    "generate_video": FunctionTool(func=generate_video),
+    "check_video_status": FunctionTool(func=check_video_status),
 }
 
+factory = AgentFactory(tool_map)
+
+# Directory of JSON / YAML specs to build at start, so hot specs are ready.
+SPEC_DIR = os.getenv("DYNAMIC_AGENT_SPEC_DIR")
+if SPEC_DIR:
+    factory.warm_up(SPEC_DIR)
+
 def create_agent_from_spec(agent_spec: AgentSpec) -> Agent:
-    agent = Agent(
-        name=agent_spec.name,
-        model=agent_spec.model,
-        description=agent_spec.description,
-        instruction=agent_spec.instruction,
-        tools=[tool_map[tool] for tool in agent_spec.tools],
-    )
-    return agent
+    return factory.build(agent_spec)
 
 
 
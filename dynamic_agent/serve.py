@@ -0,0 +1,144 @@
+"""Serves the agents of a spec directory locally, without deploying them.
+
+    DYNAMIC_AGENT_SPEC_DIR=specs python serve.py
+
+    curl -X POST localhost:8080/agents/media_agent/run \
+        -H "Content-Type: application/json" -d '{"message": "A cat on a boat"}'
+
+Spec files are polled and agents rebuilt when one changes.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel
+
+from factory import load_specs
+from main import factory
+
+logger = logging.getLogger(__name__)
+
+SPEC_DIR = os.getenv("DYNAMIC_AGENT_SPEC_DIR", "specs")
+RELOAD_INTERVAL = float(os.getenv("DYNAMIC_AGENT_RELOAD_SECONDS", "2"))
+
+# Shared by every agent, sessions are told apart by their app name.
+session_service = InMemorySessionService()
+artifact_service = InMemoryArtifactService()
+
+_runners: Dict[str, Runner] = {}
+_mtimes: Dict[str, float] = {}
+
+
+def _spec_mtimes(directory: str) -> Dict[str, float]:
+    if not os.path.isdir(directory):
+        return {}
+    return {
+        entry.path: entry.stat().st_mtime
+        for entry in os.scandir(directory)
+        if entry.name.endswith((".json", ".yaml", ".yml"))
+    }
+
+
+def reload_specs(directory: str = SPEC_DIR) -> bool:
+    """Rebuilds the runners when a spec file was added, changed or removed."""
+    global _mtimes
+    mtimes = _spec_mtimes(directory)
+    if mtimes == _mtimes:
+        return False
+    try:
+        specs = load_specs(directory)
+    except Exception:
+        logger.exception("Could not load the specs of %s, keeping the current agents", directory)
+        return False
+    _mtimes = mtimes
+    factory.specs = {spec.name: spec for spec in specs}
+    runners = {}
+    for spec in specs:
+        try:
+            agent = factory.build(spec.name)
+        except ValueError:
+            logger.exception("Skipping invalid spec %s", spec.name)
+            continue
+        # The factory returns the same agent for an unchanged spec, keep its runner.
+        runner = _runners.get(spec.name)
+        if runner is None or runner.agent is not agent:
+            runner = Runner(
+                app_name=spec.name,
+                agent=agent,
+                session_service=session_service,
+                artifact_service=artifact_service,
+            )
+        runners[spec.name] = runner
+    _runners.clear()
+    _runners.update(runners)
+    logger.info("Serving agents: %s", ", ".join(sorted(_runners)))
+    return True
+
+
+async def _watch_specs():
+    while True:
+        await asyncio.sleep(RELOAD_INTERVAL)
+        reload_specs()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    reload_specs()
+    watcher = asyncio.create_task(_watch_specs())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class RunRequest(BaseModel):
+    message: str
+    user_id: str = "user"
+    session_id: Optional[str] = None
+
+
+@app.get("/agents")
+async def list_agents():
+    return sorted(_runners)
+
+
+@app.post("/agents/{name}/run")
+async def run_agent(name: str, request: RunRequest):
+    runner = _runners.get(name)
+    if runner is None:
+        raise HTTPException(status_code=404, detail=f"Unknown agent {name}")
+    session = None
+    if request.session_id:
+        session = await session_service.get_session(
+            app_name=name, user_id=request.user_id, session_id=request.session_id
+        )
+    if session is None:
+        session = await session_service.create_session(
+            app_name=name, user_id=request.user_id, session_id=request.session_id
+        )
+    response = []
+    async for event in runner.run_async(
+        user_id=request.user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=request.message)]),
+    ):
+        if event.is_final_response() and event.content and event.content.parts:
+            response.extend(part.text for part in event.content.parts if part.text)
+    return {"session_id": session.id, "response": "\n".join(response)}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8080")))
@@ -0,0 +1,3 @@
+from .backends import CacheEntry, InMemoryBackend, SqliteBackend
+from .cache import CacheStats, LlmResponseCache, cache_for, model_callbacks, response_cache
+from .keys import embed, request_key, scope_key
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from .keys import cosine
+
+CACHE_DIR = os.getenv(
+    "LLM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "llm_cache")
+)
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+
+
+@dataclass
+class CacheEntry:
+    response: str  # LlmResponse as JSON
+    agent: str
+    expires_at: float
+    latency: float  # Seconds the model took to answer, saved by each hit.
+    scope: Optional[str] = None
+    embedding: Optional[array] = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+
+class InMemoryBackend:
+    """Entries of this process, least recently used evicted past `max_entries`."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._scopes: Dict[str, Set[str]] = {}
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        if entry.scope in self._scopes:
+            self._scopes[entry.scope].discard(key)
+            if not self._scopes[entry.scope]:
+                del self._scopes[entry.scope]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.fresh:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        if entry.scope and entry.embedding is not None:
+            self._scopes.setdefault(entry.scope, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def nearest(self, scope: str, embedding: array, threshold: float) -> Optional[CacheEntry]:
+        best: Tuple[float, Optional[str]] = (threshold, None)
+        for key in self._scopes.get(scope, ()):
+            entry = self._entries[key]
+            if entry.fresh:
+                score = cosine(embedding, entry.embedding)
+                if score >= best[0]:
+                    best = (score, key)
+        return self.get(best[1]) if best[1] else None
+
+
+class SqliteBackend:
+    """Entries shared by the processes of a machine, in one SQLite file."""
+
+    def __init__(self, path: str = os.path.join(CACHE_DIR, "responses.sqlite"), max_entries: int = MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, response TEXT, agent TEXT, expires_at REAL,"
+            " latency REAL, scope TEXT, embedding BLOB, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_scope ON entries (scope)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def _entry(row) -> CacheEntry:
+        response, agent, expires_at, latency, scope, blob = row
+        embedding = None
+        if blob is not None:
+            embedding = array("f")
+            embedding.frombytes(blob)
+        return CacheEntry(response, agent, expires_at, latency, scope, embedding)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, agent, expires_at, latency, scope, embedding"
+                " FROM entries WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return self._entry(row)
+
+    def put(self, key: str, entry: CacheEntry):
+        blob = entry.embedding.tobytes() if entry.embedding is not None else None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.response, entry.agent, entry.expires_at, entry.latency,
+                 entry.scope, blob, time.time()),
+            )
+            self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries"
+                " ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def nearest(self, scope: str, embedding: array, threshold: float) -> Optional[CacheEntry]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, embedding FROM entries"
+                " WHERE scope = ? AND embedding IS NOT NULL AND expires_at > ?",
+                (scope, time.time()),
+            ).fetchall()
+        best: Tuple[float, Optional[str]] = (threshold, None)
+        for key, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            score = cosine(embedding, vector)
+            if score >= best[0]:
+                best = (score, key)
+        return self.get(best[1]) if best[1] else None
@@ -0,0 +1,175 @@
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from .backends import CacheEntry, InMemoryBackend, SqliteBackend
+from .keys import embed, request_key, scope_key, similarity_text
+
+logger = logging.getLogger(__name__)
+
+# "off" (default), "memory" (this process) or "sqlite" (shared on disk, see
+# LLM_CACHE_DIR). Cached answers are shared across sessions, so it is opt-in.
+LLM_CACHE = os.getenv("LLM_CACHE", "off")
+DEFAULT_TTL = float(os.getenv("LLM_CACHE_TTL", "600"))
+# Cosine similarity above which a reworded user message reuses an answer,
+# unset to only reuse answers to identical requests.
+SIMILARITY_THRESHOLD = (
+    float(os.environ["LLM_CACHE_SIMILARITY"]) if os.getenv("LLM_CACHE_SIMILARITY") else None
+)
+MAX_PENDING = 1024
+
+
+@dataclass
+class CacheStats:
+    requests: int = 0
+    hits: int = 0
+    similar_hits: int = 0
+    latency_saved: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+
+class LlmResponseCache:
+    """Model response cache plugged in through before/after_model_callback.
+
+    Requests are keyed by a hash of the model, contents and config (system
+    instruction, tools, generation parameters). With a similarity threshold,
+    a request that misses can reuse the answer to a near-identical last user
+    message in the same conversation. Entries expire after the TTL of their
+    agent (`set_ttl`, default `ttl`). Hits, hit ratio and the model latency
+    they saved are kept per agent, see `export`.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = DEFAULT_TTL,
+        similarity_threshold: Optional[float] = SIMILARITY_THRESHOLD,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.ttls: Dict[str, float] = {}
+        self.stats: Dict[str, CacheStats] = defaultdict(CacheStats)
+        self._pending: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def set_ttl(self, agent: str, ttl: float):
+        self.ttls[agent] = ttl
+
+    def lookup(self, agent: str, llm_request: LlmRequest) -> Tuple[Optional[LlmResponse], tuple]:
+        """The cached response if any, and what `store` needs to cache a new one."""
+        key = request_key(llm_request)
+        scope = embedding = None
+        stats = self.stats[agent]
+        stats.requests += 1
+        entry = self.backend.get(key)
+        if entry is None and self.similarity_threshold is not None:
+            text = similarity_text(llm_request)
+            if text:
+                scope, embedding = scope_key(llm_request), embed(text)
+                entry = self.backend.nearest(scope, embedding, self.similarity_threshold)
+                if entry:
+                    stats.similar_hits += 1
+        if entry is None:
+            return None, (key, scope, embedding)
+        stats.hits += 1
+        stats.latency_saved += entry.latency
+        logger.info(
+            "LLM cache hit for %s, hit ratio %.0f%%, %.1fs saved",
+            agent, stats.hit_ratio * 100, stats.latency_saved,
+        )
+        return LlmResponse.model_validate_json(entry.response), (key, scope, embedding)
+
+    def store(self, agent: str, pending: tuple, llm_response: LlmResponse, latency: float):
+        if llm_response.partial or llm_response.error_code or not llm_response.content:
+            return
+        key, scope, embedding = pending
+        self.backend.put(key, CacheEntry(
+            response=llm_response.model_dump_json(exclude_none=True),
+            agent=agent,
+            expires_at=time.time() + self.ttls.get(agent, self.ttl),
+            latency=latency,
+            scope=scope,
+            embedding=embedding,
+        ))
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        if not self.enabled:
+            return None
+        response, pending = self.lookup(callback_context.agent_name, llm_request)
+        if response is None:
+            self._pending[(callback_context.invocation_id, callback_context.agent_name)] = (
+                pending, time.monotonic()
+            )
+            while len(self._pending) > MAX_PENDING:
+                self._pending.popitem(last=False)
+        return response
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        # Streamed chunks come first, the entry waits for the final response.
+        if not self.enabled or llm_response.partial:
+            return None
+        pending = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if pending:
+            self.store(callback_context.agent_name, pending[0], llm_response, time.monotonic() - pending[1])
+        return None
+
+    def export(self) -> Dict[str, Dict[str, Any]]:
+        """Per agent requests, hits, similar hits, hit ratio and latency saved."""
+        return {
+            agent: {**asdict(stats), "hit_ratio": stats.hit_ratio}
+            for agent, stats in self.stats.items()
+        }
+
+
+def _backend():
+    if LLM_CACHE == "memory":
+        return InMemoryBackend()
+    if LLM_CACHE == "sqlite":
+        return SqliteBackend()
+    return None
+
+
+response_cache = LlmResponseCache(_backend())
+
+
+def cache_for(agent: str, ttl: Optional[float] = None) -> Optional[LlmResponseCache]:
+    """The shared cache when enabled, with `ttl` for `agent` if given."""
+    if not response_cache.enabled:
+        return None
+    if ttl is not None:
+        response_cache.set_ttl(agent, ttl)
+    return response_cache
+
+
+def model_callbacks(
+    agent: str, *before: Callable, ttl: Optional[float] = None
+) -> Dict[str, List[Callable]]:
+    """before/after_model_callback arguments of an LlmAgent.
+
+    The `before` callbacks run first, then the cache lookup when the cache
+    is enabled, e.g. `Agent(..., **model_callbacks("agent", short_circuit))`.
+    """
+    cache = cache_for(agent, ttl)
+    if cache is None:
+        return {"before_model_callback": list(before), "after_model_callback": []}
+    return {
+        "before_model_callback": [*before, cache.before_model_callback],
+        "after_model_callback": [cache.after_model_callback],
+    }
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import math
+import re
+from array import array
+from typing import Any, Dict, Optional
+
+from google.adk.models import LlmRequest
+
+EMBEDDING_DIM = 512
+NGRAM = 3
+
+
+def canonical_request(llm_request: LlmRequest) -> Dict[str, Any]:
+    """What decides the model's answer: model, contents and the config.
+
+    The config carries the system instruction, the tool declarations and the
+    generation parameters. Transport options are left out.
+    """
+    config = llm_request.config
+    return {
+        "model": llm_request.model,
+        "contents": [
+            content.model_dump(mode="json", exclude_none=True)
+            for content in llm_request.contents or []
+        ],
+        "config": config.model_dump(
+            mode="json", exclude_none=True, exclude={"http_options", "labels"}
+        )
+        if config
+        else None,
+    }
+
+
+def _hash(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    return _hash(canonical_request(llm_request))
+
+
+def scope_key(llm_request: LlmRequest) -> str:
+    """The key of the request without its last turn.
+
+    Near-duplicates are only looked for among requests sharing it, i.e. with
+    the same model, config and conversation up to the new user message.
+    """
+    canonical = canonical_request(llm_request)
+    canonical["contents"] = canonical["contents"][:-1]
+    return _hash(canonical)
+
+
+def similarity_text(llm_request: LlmRequest) -> Optional[str]:
+    """The text compared by the similarity tier, the last user turn.
+
+    Requests whose last turn is not plain user text (tool results, media) only
+    match exactly.
+    """
+    contents = llm_request.contents or []
+    if not contents or contents[-1].role != "user":
+        return None
+    parts = contents[-1].parts or []
+    if not parts or any(part.text is None for part in parts):
+        return None
+    return " ".join(part.text for part in parts)
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> array:
+    """Unit-length hashed character n-gram vector, a cheap local embedding."""
+    text = " " + " ".join(re.findall(r"\w+", text.lower())) + " "
+    vector = array("f", [0.0]) * dim
+    for i in range(len(text) - NGRAM + 1):
+        digest = hashlib.blake2b(text[i : i + NGRAM].encode(), digest_size=4).digest()
+        vector[int.from_bytes(digest, "little") % dim] += 1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    for i in range(dim):
+        vector[i] /= norm
+    return vector
+
+
+def cosine(a: array, b: array) -> float:
+    return sum(x * y for x, y in zip(a, b))
@@ -1,47 +1,85 @@
+import asyncio
 import os
 import time
+from typing import List, Optional
 
 from google.adk.agents import Agent
 from google.adk.planners import BuiltInPlanner
 from google.adk.tools import FunctionTool, ToolContext, load_artifacts
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, SseConnectionParams
-from google.genai import Client, types
+from google.genai import types
 import uuid
 
+try:
+    from llm_cache import model_callbacks
+except ImportError:  # Deployed without the llm_cache package.
+    def model_callbacks(agent, *before, ttl=None):
+        return {"before_model_callback": list(before), "after_model_callback": []}
+
+from .artifacts import local_path
+from .clients import get_client, model_limit
+from .image_cache import cacheable, image_cache
+from .previews import downscale_artifact_images
+
 MODEL = "gemini-2.5-flash"
 MODEL_IMAGE = "imagen-4.0-fast-generate-preview-06-06"
 MODEL_VIDEO = "veo-2.0-generate-001"
+# Imagen returns at most 4 images per request.
+MAX_IMAGES_PER_CALL = 4
+# When set, e.g. gs://bucket/videos/, Veo writes videos there and the artifacts
+# only reference them instead of holding the bytes.
+OUTPUT_GCS_URI = os.getenv("MEDIA_OUTPUT_GCS_URI")
+
+client = get_client()
+
+
+async def _generate_image_bytes(img_prompt: str, aspect_ratio: str, seed: Optional[int]):
+    """Returns (image bytes, enhanced prompt), from the image cache when allowed."""
+    enhance_prompt = True
+    use_cache = cacheable(seed)
+    if use_cache:
+        key = image_cache.key(MODEL_IMAGE, img_prompt, aspect_ratio, enhance_prompt, seed)
+        cached = await asyncio.to_thread(image_cache.get, key)
+        if cached:
+            print(f"Image cache hit for {key}")
+            return cached
+    async with model_limit(MODEL_IMAGE):
+        response = await client.aio.models.generate_images(
+            model=MODEL_IMAGE,
+            prompt=img_prompt,
+            config=types.GenerateImagesConfig(
+                number_of_images=1, 
+                aspect_ratio=aspect_ratio, 
+                enhance_prompt=enhance_prompt,
+                # Imagen only honours a seed when no watermark is added.
+                seed=seed,
+                add_watermark=False if seed is not None else None),
+        )
+    if not response.generated_images:
+        return None
+    image_bytes = response.generated_images[0].image.image_bytes
+    prompt = response.generated_images[0].enhanced_prompt or img_prompt
+    if use_cache:
+        await asyncio.to_thread(image_cache.put, key, image_bytes, prompt)
+    return image_bytes, prompt
 
-client = Client(
-    vertexai=True,
-    project=os.getenv("GOOGLE_CLOUD_PROJECT"),
-    location=os.getenv("GOOGLE_CLOUD_LOCATION"),
-)
 
+async def generate_image(tool_context: "ToolContext", img_prompt: str, aspect_ratio: str = "16:9", seed: Optional[int] = None):
+    """Generates an image based on the prompt.
 
-async def generate_image(tool_context: "ToolContext", img_prompt: str, aspect_ratio: str = "16:9"):
-    """Generates an image based on the prompt."""
+    Pass a seed to get a reproducible image.
+    """
     print("#"*27)
     print(img_prompt)
-    response = client.models.generate_images(
-        model=MODEL_IMAGE,
-        prompt=img_prompt,
-        config=types.GenerateImagesConfig(
-            number_of_images=1, 
-            aspect_ratio=aspect_ratio, 
-            enhance_prompt=True),
-    )
-    if not response.generated_images:
+    generated = await _generate_image_bytes(img_prompt, aspect_ratio, seed)
+    if not generated:
         return {"status": "failed"}
-    image_bytes = response.generated_images[0].image.image_bytes
+    image_bytes, prompt = generated
     filename = f"generated_image_{uuid.uuid4()}.png" 
     version = await tool_context.save_artifact(
         filename,
         types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
     )
-    prompt = img_prompt
-    if response.generated_images[0].enhanced_prompt:
-        prompt = response.generated_images[0].enhanced_prompt
     tool_context.state.update({filename : prompt})
     print(f"Image saved with version: {version}")
     return {
@@ -50,26 +88,16 @@ async def generate_image(tool_context: "ToolContext", img_prompt: str, aspect_ra
         "filename": filename,
     }
 
-async def modify_image(tool_context: "ToolContext", img_prompt: str, image_filename: str, aspect_ratio: str = "16:9"):
+async def modify_image(tool_context: "ToolContext", img_prompt: str, image_filename: str, aspect_ratio: str = "16:9", seed: Optional[int] = None):
     """Modify an image based on the modified prompt."""
-    response = client.models.generate_images(
-        model=MODEL_IMAGE,
-        prompt=img_prompt,
-        config=types.GenerateImagesConfig(
-            number_of_images=1, 
-            aspect_ratio=aspect_ratio, 
-            enhance_prompt=True),
-    )
-    if not response.generated_images:
+    generated = await _generate_image_bytes(img_prompt, aspect_ratio, seed)
+    if not generated:
         return {"status": "failed"}
-    image_bytes = response.generated_images[0].image.image_bytes
+    image_bytes, prompt = generated
     version = await tool_context.save_artifact(
         image_filename,
         types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
     )
-    prompt = img_prompt
-    if response.generated_images[0].enhanced_prompt:
-        prompt = response.generated_images[0].enhanced_prompt
     tool_context.state.update({image_filename : prompt})
     print(f"Image saved with version: {version}")
     return {
@@ -78,54 +106,179 @@ async def modify_image(tool_context: "ToolContext", img_prompt: str, image_filen
         "filename": image_filename,
     }
 
-async def generate_video(tool_context: "ToolContext", video_prompt: str, image_filename: str, aspect_ratio: str = "16:9"):
-    """Generates a video based on the prompt and image."""
-    image_artifact = await tool_context.load_artifact(image_filename)
-    if image_artifact and image_artifact.inline_data:
-        print(f"Successfully loaded latest Python artifact '{image_filename}'.")
-        print(f"MIME Type: {image_artifact.inline_data.mime_type}")
-        # Process the report_artifact.inline_data.data (bytes)
-        image_bytes = image_artifact.inline_data.data
-        print(f"Report size: {len(image_bytes)} bytes.")
-        # ... further processing ...
-        operation = client.models.generate_videos(
-            model=MODEL_VIDEO,
-            prompt=video_prompt,
-            image=types.Image(image_bytes=image_bytes, mime_type="image/png"),
-            config={
-                "number_of_videos": 1,
-                "aspect_ratio": aspect_ratio,
-            },
-        )
+async def generate_image_variants(tool_context: "ToolContext", img_prompt: str, number_of_images: int = 4, aspect_ratios: Optional[List[str]] = None):
+    """Generates several variants of an image in one go.
 
-        while not operation.done:
-            time.sleep(5)
-            operation = client.operations.get(operation)
+    Makes number_of_images images (at most 4) for each aspect ratio in
+    aspect_ratios (default 16:9) and returns all their filenames.
+    """
+    number_of_images = max(1, min(number_of_images, MAX_IMAGES_PER_CALL))
+    aspect_ratios = aspect_ratios or ["16:9"]
+
+    async def generate(aspect_ratio: str):
+        async with model_limit(MODEL_IMAGE):
+            return await client.aio.models.generate_images(
+                model=MODEL_IMAGE,
+                prompt=img_prompt,
+                config=types.GenerateImagesConfig(
+                    number_of_images=number_of_images,
+                    aspect_ratio=aspect_ratio,
+                    enhance_prompt=True),
+            )
+
+    responses = await asyncio.gather(
+        *(generate(aspect_ratio) for aspect_ratio in aspect_ratios), return_exceptions=True
+    )
+    images = []
+    for aspect_ratio, response in zip(aspect_ratios, responses):
+        if isinstance(response, Exception):
+            print(f"Image generation failed for {aspect_ratio}: {response}")
+            continue
+        for generated_image in response.generated_images or []:
+            images.append((aspect_ratio, generated_image))
+    if not images:
+        return {"status": "failed"}
 
-        if not operation.result.generated_videos:
-            return {"status": "failed"}
-        video_bytes = operation.result.generated_videos[0].video.video_bytes
-        filename = f"generated_video_{uuid.uuid4()}.mp4" 
-        version = await tool_context.save_artifact(
+    filenames = [f"generated_image_{uuid.uuid4()}.png" for _ in images]
+    await asyncio.gather(*(
+        tool_context.save_artifact(
             filename,
-            types.Part.from_bytes(data=video_bytes, mime_type="video/mp4"),
+            types.Part.from_bytes(data=generated_image.image.image_bytes, mime_type="image/png"),
         )
-        print(f"Video saved with version: {version}")
-        return {
-            "status": "success",
-            "detail": "Video generated successfully and stored in artifacts.",
-            "filename": filename,
+        for filename, (_, generated_image) in zip(filenames, images)
+    ))
+    tool_context.state.update({
+        filename: generated_image.enhanced_prompt or img_prompt
+        for filename, (_, generated_image) in zip(filenames, images)
+    })
+    return {
+        "status": "success",
+        "detail": f"{len(filenames)} images generated successfully and stored in artifacts.",
+        "images": [
+            {"filename": filename, "aspect_ratio": aspect_ratio}
+            for filename, (aspect_ratio, _) in zip(filenames, images)
+        ],
+    }
+
+async def _wait_for_operation(operation, initial_delay: float = 5, max_delay: float = 30, timeout: float = 600):
+    """Polls a long-running operation without blocking the event loop."""
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    while not operation.done:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Operation {operation.name} did not finish in {timeout}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+        operation = await client.aio.operations.get(operation)
+    return operation
+
+
+# State key of the videos saved so far, {job_id: filename}.
+VIDEO_JOBS_KEY = "video_jobs"
+
+
+async def _save_video(tool_context: "ToolContext", operation):
+    if not operation.result or not operation.result.generated_videos:
+        return {"status": "failed"}
+    video = operation.result.generated_videos[0].video
+    if video.uri and not video.video_bytes:
+        artifact = types.Part(file_data=types.FileData(file_uri=video.uri, mime_type="video/mp4"))
+    else:
+        artifact = types.Part.from_bytes(data=video.video_bytes, mime_type="video/mp4")
+    filename = f"generated_video_{uuid.uuid4()}.mp4" 
+    version = await tool_context.save_artifact(filename, artifact)
+    print(f"Video saved with version: {version}")
+    if operation.name:
+        tool_context.state[VIDEO_JOBS_KEY] = {
+            **(tool_context.state.get(VIDEO_JOBS_KEY) or {}), operation.name: filename
         }
+    return {
+        "status": "success",
+        "detail": "Video generated successfully and stored in artifacts.",
+        "filename": filename,
+    }
+
+
+async def _image_input(artifact: types.Part) -> Optional[types.Image]:
+    """The Veo input for an image artifact, by reference when it is in GCS."""
+    if artifact.inline_data:
+        return types.Image(image_bytes=artifact.inline_data.data, mime_type=artifact.inline_data.mime_type or "image/png")
+    if artifact.file_data:
+        path = local_path(artifact.file_data.file_uri)
+        if path is None:
+            return types.Image(gcs_uri=artifact.file_data.file_uri, mime_type=artifact.file_data.mime_type)
+        with open(path, "rb") as f:
+            image_bytes = await asyncio.to_thread(f.read)
+        return types.Image(image_bytes=image_bytes, mime_type=artifact.file_data.mime_type or "image/png")
+    return None
+
+
+async def generate_video(tool_context: "ToolContext", video_prompt: str, image_filename: str, aspect_ratio: str = "16:9", wait_for_completion: bool = True):
+    """Generates a video based on the prompt and image.
+
+    With wait_for_completion=False, returns a job_id right away; use
+    check_video_status with it to get the video once it is ready.
+    """
+    image_artifact = await tool_context.load_artifact(image_filename)
+    image = await _image_input(image_artifact) if image_artifact else None
+    if image:
+        print(f"Successfully loaded latest Python artifact '{image_filename}'.")
+        config = {
+            "number_of_videos": 1,
+            "aspect_ratio": aspect_ratio,
+        }
+        if OUTPUT_GCS_URI:
+            config["output_gcs_uri"] = OUTPUT_GCS_URI
+        async with model_limit(MODEL_VIDEO):
+            operation = await client.aio.models.generate_videos(
+                model=MODEL_VIDEO,
+                prompt=video_prompt,
+                image=image,
+                config=config,
+            )
+        pending = {
+            "status": "pending",
+            "detail": "Video generation started, check on it with check_video_status.",
+            "job_id": operation.name,
+        }
+        if not wait_for_completion:
+            return pending
+
+        try:
+            operation = await _wait_for_operation(operation)
+        except TimeoutError:
+            # The job keeps running, check_video_status picks it up from here.
+            return pending
+        return await _save_video(tool_context, operation)
     else:
         print(f"Python artifact '{image_filename}' not found.")
         return {
             "status": "error",
             "detail": "Image not found."
         }
+
+
+async def check_video_status(tool_context: "ToolContext", job_id: str):
+    """Checks a video job started by generate_video and stores the video once done."""
+    filename = (tool_context.state.get(VIDEO_JOBS_KEY) or {}).get(job_id)
+    if filename:
+        return {
+            "status": "success",
+            "detail": "Video already stored in artifacts.",
+            "filename": filename,
+        }
+    operation = await client.aio.operations.get(types.GenerateVideosOperation(name=job_id))
+    if not operation.done:
+        return {"status": "pending", "detail": "The video is not ready yet.", "job_id": job_id}
+    if operation.error:
+        return {"status": "failed", "detail": str(operation.error)}
+    return await _save_video(tool_context, operation)
     
 
 generate_image_tool = FunctionTool(func=generate_image)
+generate_image_variants_tool = FunctionTool(func=generate_image_variants)
 generate_video_tool = FunctionTool(func=generate_video)
+check_video_status_tool = FunctionTool(func=check_video_status)
 modify_image_tool = FunctionTool(func=modify_image)
 # mcp_toolset = MCPToolset(
 #     connection_params=SseConnectionParams(url="http://localhost:8000/mcp"),
@@ -143,8 +296,12 @@ root_agent = Agent(
     instruction=(
         "You are a helpful agent who can answer user questions and generate images."
         "When user ask you to generate an image, always generate images using the generate_image tool."
+        "When user ask for several options or formats of an image, use the generate_image_variants tool once instead of calling generate_image repeatedly."
         "When user ask you to generate a video, always generate an image first using the generate_image tool."
         "Then use the generate_video tool to generate a video from the image."
+        "If generate_video returns a job_id, use check_video_status with it when the user asks about the video."
     ),
-    tools=[generate_image_tool, generate_video_tool, load_artifacts],
+    # Previews first, so the cache key is computed on the smaller request.
+    **model_callbacks("media_agent", downscale_artifact_images),
+    tools=[generate_image_tool, generate_image_variants_tool, generate_video_tool, check_video_status_tool, load_artifacts],
 )
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+from google.adk.artifacts import BaseArtifactService
+from google.genai import types
+
+ARTIFACT_DIR = os.getenv(
+    "MEDIA_ARTIFACT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "media_agent", "artifacts"),
+)
+# Payloads above this size are loaded as file:// references instead of bytes.
+INLINE_LIMIT = int(os.getenv("MEDIA_ARTIFACT_INLINE_MB", "8")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def local_path(uri: str) -> Optional[str]:
+    """The path of a file:// uri, None for any other scheme."""
+    parts = urlsplit(uri)
+    return url2pathname(parts.path) if parts.scheme == "file" else None
+
+
+class LocalFileArtifactService(BaseArtifactService):
+    """Artifact service keeping every version as a file on local disk.
+
+    Meant for tests and local runs, it keeps memory bounded for large media:
+    bytes are written in chunks, file:// artifacts are copied file to file,
+    gs:// artifacts are stored as references only, and payloads above
+    `inline_limit` are loaded back as file:// references rather than bytes.
+
+    Layout: <root>/<app>/<user>/<session or "user">/<filename>/<version>.bin
+    with a <version>.json sidecar holding the mime type or the reference.
+    Use it with `Runner(..., artifact_service=LocalFileArtifactService())`.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, inline_limit: int = INLINE_LIMIT):
+        self.root = root
+        self.inline_limit = inline_limit
+
+    def _dir(self, app_name: str, user_id: str, session_id: Optional[str], filename: str = "") -> str:
+        # "user:" artifacts are shared by all the sessions of a user.
+        scope = "user" if filename.startswith("user:") or session_id is None else session_id
+        # Filenames come from the model, none may point outside `root`.
+        for part in (app_name, user_id, scope, filename):
+            if part in (".", "..") or os.path.basename(part) != part:
+                raise ValueError(f"Invalid artifact path component: {part!r}")
+        return os.path.join(self.root, app_name, user_id, scope, filename)
+
+    @staticmethod
+    def _versions(directory: str) -> List[int]:
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            int(name[: -len(".json")]) for name in os.listdir(directory) if name.endswith(".json")
+        )
+
+    def _save(self, directory: str, artifact: types.Part, custom_metadata: Optional[Dict[str, Any]]) -> int:
+        os.makedirs(directory, exist_ok=True)
+        versions = self._versions(directory)
+        version = versions[-1] + 1 if versions else 0
+        path = os.path.join(directory, f"{version}.bin")
+        meta: Dict[str, Any] = {"custom_metadata": custom_metadata or {}}
+        if artifact.inline_data:
+            data = memoryview(artifact.inline_data.data)
+            with open(path, "wb") as f:
+                for start in range(0, len(data), CHUNK_SIZE):
+                    f.write(data[start : start + CHUNK_SIZE])
+            meta["mime_type"] = artifact.inline_data.mime_type
+        elif artifact.file_data:
+            source = local_path(artifact.file_data.file_uri)
+            if source:
+                with open(source, "rb") as src, open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            else:
+                meta["file_uri"] = artifact.file_data.file_uri
+            meta["mime_type"] = artifact.file_data.mime_type
+        elif artifact.text is not None:
+            with open(path, "w") as f:
+                f.write(artifact.text)
+            meta["text"] = True
+        else:
+            raise ValueError("Artifact has no inline_data, file_data or text.")
+        # The sidecar is written last, a version only exists once it is there.
+        with open(os.path.join(directory, f"{version}.json"), "w") as f:
+            json.dump(meta, f)
+        return version
+
+    def _load(self, directory: str, version: Optional[int]) -> Optional[types.Part]:
+        versions = self._versions(directory)
+        if not versions:
+            return None
+        version = versions[-1] if version is None else version
+        if version not in versions:
+            return None
+        with open(os.path.join(directory, f"{version}.json")) as f:
+            meta = json.load(f)
+        path = os.path.join(directory, f"{version}.bin")
+        if meta.get("file_uri"):
+            return types.Part(file_data=types.FileData(file_uri=meta["file_uri"], mime_type=meta.get("mime_type")))
+        if meta.get("text"):
+            with open(path) as f:
+                return types.Part(text=f.read())
+        if os.path.getsize(path) > self.inline_limit:
+            return types.Part(file_data=types.FileData(
+                file_uri="file://" + os.path.abspath(path), mime_type=meta.get("mime_type")
+            ))
+        with open(path, "rb") as f:
+            return types.Part.from_bytes(data=f.read(), mime_type=meta.get("mime_type"))
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: types.Part,
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        directory = self._dir(app_name, user_id, session_id, filename)
+        return await asyncio.to_thread(self._save, directory, artifact, custom_metadata)
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        directory = self._dir(app_name, user_id, session_id, filename)
+        return await asyncio.to_thread(self._load, directory, version)
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> List[str]:
+        scopes = {self._dir(app_name, user_id, session_id), self._dir(app_name, user_id, None)}
+        return sorted(
+            name
+            for scope in scopes
+            if os.path.isdir(scope)
+            for name in os.listdir(scope)
+            if self._versions(os.path.join(scope, name))
+        )
+
+    async def delete_artifact(
+        self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None
+    ) -> None:
+        shutil.rmtree(self._dir(app_name, user_id, session_id, filename), ignore_errors=True)
+
+    async def list_versions(
+        self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None
+    ) -> List[int]:
+        return self._versions(self._dir(app_name, user_id, session_id, filename))
+
+    def _version_info(self, directory: str, version: int):
+        from google.adk.artifacts.base_artifact_service import ArtifactVersion
+
+        with open(os.path.join(directory, f"{version}.json")) as f:
+            meta = json.load(f)
+        return ArtifactVersion(
+            version=version,
+            canonical_uri=meta.get("file_uri") or "file://" + os.path.abspath(os.path.join(directory, f"{version}.bin")),
+            custom_metadata=meta.get("custom_metadata") or {},
+            create_time=os.path.getmtime(os.path.join(directory, f"{version}.json")),
+            mime_type=meta.get("mime_type"),
+        )
+
+    async def list_artifact_versions(
+        self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None
+    ) -> list:
+        directory = self._dir(app_name, user_id, session_id, filename)
+        return [self._version_info(directory, version) for version in self._versions(directory)]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ):
+        directory = self._dir(app_name, user_id, session_id, filename)
+        versions = self._versions(directory)
+        if not versions:
+            return None
+        version = versions[-1] if version is None else version
+        return self._version_info(directory, version) if version in versions else None
@@ -0,0 +1,44 @@
+import asyncio
+import functools
+import os
+from typing import Dict, Optional
+
+from google.genai import Client
+
+# Concurrent requests per model, sized to the project's quota.
+MODEL_CONCURRENCY = {
+    "imagen-4.0-fast-generate-preview-06-06": int(os.getenv("IMAGEN_MAX_CONCURRENCY", "4")),
+    "veo-2.0-generate-001": int(os.getenv("VEO_MAX_CONCURRENCY", "2")),
+}
+DEFAULT_MODEL_CONCURRENCY = 4
+
+_model_limits: Dict[str, asyncio.Semaphore] = {}
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _client(project: Optional[str], location: Optional[str]) -> Client:
+    return Client(vertexai=True, project=project, location=location)
+
+
+def get_client(project: Optional[str] = None, location: Optional[str] = None) -> Client:
+    """Process-wide client for a project and location, built once and shared."""
+    return _client(
+        project or os.getenv("GOOGLE_CLOUD_PROJECT"),
+        location or os.getenv("GOOGLE_CLOUD_LOCATION"),
+    )
+
+
+def model_limit(model: str) -> asyncio.Semaphore:
+    """Caps the requests in flight to `model` across every session."""
+    global _loop
+    # Semaphores belong to one event loop, start over when it changes.
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _model_limits.clear()
+        _loop = loop
+    if model not in _model_limits:
+        _model_limits[model] = asyncio.Semaphore(
+            MODEL_CONCURRENCY.get(model, DEFAULT_MODEL_CONCURRENCY)
+        )
+    return _model_limits[model]
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from typing import Optional, Tuple
+
+# "off": always call Imagen.
+# "seeded": reuse images of calls that pass a seed, i.e. are reproducible.
+# "always": reuse any earlier image of the same model, prompt and config.
+CACHE_MODE = os.getenv("MEDIA_IMAGE_CACHE", "off")
+CACHE_DIR = os.getenv(
+    "MEDIA_IMAGE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "media_agent", "images"),
+)
+MAX_CACHE_BYTES = int(os.getenv("MEDIA_IMAGE_CACHE_MB", "512")) * 1024 * 1024
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.lower().split())
+
+
+def cacheable(seed: Optional[int]) -> bool:
+    return CACHE_MODE == "always" or (CACHE_MODE == "seeded" and seed is not None)
+
+
+class ImageCache:
+    """Content-addressed store of generated images on local disk.
+
+    The key hashes everything that determines the output (model, normalized
+    prompt, aspect ratio, enhance_prompt, seed). Each entry is the image
+    bytes plus the enhanced prompt Imagen returned. The directory is kept
+    under `max_bytes` by evicting the least recently used entries.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(model: str, prompt: str, aspect_ratio: str, enhance_prompt: bool, seed: Optional[int]) -> str:
+        payload = json.dumps(
+            [model, normalize_prompt(prompt), aspect_ratio, enhance_prompt, seed]
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            with open(self._path(key, ".png"), "rb") as f:
+                image_bytes = f.read()
+            with open(self._path(key, ".json")) as f:
+                enhanced_prompt = json.load(f)["enhanced_prompt"]
+        except (OSError, ValueError, KeyError):
+            return None
+        # The mtime doubles as the last access time for eviction.
+        os.utime(self._path(key, ".png"))
+        return image_bytes, enhanced_prompt
+
+    def put(self, key: str, image_bytes: bytes, enhanced_prompt: str):
+        os.makedirs(self.directory, exist_ok=True)
+        for suffix, data in (
+            (".png", image_bytes),
+            (".json", json.dumps({"enhanced_prompt": enhanced_prompt}).encode()),
+        ):
+            tmp = self._path(key, suffix + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key, suffix))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".png"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name[: -len(".png")]))
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for suffix in (".png", ".json"):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+            total -= size
+
+
+image_cache = ImageCache()
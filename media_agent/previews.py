@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+PREVIEW_MAX_SIDE = int(os.getenv("MEDIA_PREVIEW_MAX_SIDE", "768"))
+PREVIEW_FORMAT = os.getenv("MEDIA_PREVIEW_FORMAT", "JPEG").upper()  # JPEG or WEBP
+PREVIEW_QUALITY = int(os.getenv("MEDIA_PREVIEW_QUALITY", "80"))
+MAX_PREVIEWS = 512
+
+# (session id, artifact name, digest of the artifact bytes) -> preview part.
+# The digest identifies the artifact version, which the part does not carry.
+_previews: "OrderedDict[tuple, types.Part]" = OrderedDict()
+
+
+def make_preview(image_bytes: bytes) -> Optional[Tuple[bytes, str]]:
+    """A downscaled, re-encoded copy of an image, None when Pillow is missing."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.thumbnail((PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format=PREVIEW_FORMAT, quality=PREVIEW_QUALITY)
+    return out.getvalue(), f"image/{PREVIEW_FORMAT.lower()}"
+
+
+def _artifact_name(part: types.Part) -> Optional[str]:
+    # load_artifacts puts "Artifact <name> is:" right before each artifact.
+    text = (part.text or "").strip()
+    if text.startswith("Artifact ") and text.endswith(" is:"):
+        return text[len("Artifact ") : -len(" is:")]
+    return None
+
+
+async def _preview(session_id: str, name: str, part: types.Part) -> types.Part:
+    data = part.inline_data.data
+    key = (session_id, name, hashlib.sha1(data).hexdigest())
+    if key in _previews:
+        _previews.move_to_end(key)
+        return _previews[key]
+    preview = await asyncio.to_thread(make_preview, data)
+    if preview is None or len(preview[0]) >= len(data):
+        result = part
+    else:
+        result = types.Part.from_bytes(data=preview[0], mime_type=preview[1])
+    _previews[key] = result
+    while len(_previews) > MAX_PREVIEWS:
+        _previews.popitem(last=False)
+    return result
+
+
+async def downscale_artifact_images(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """before_model_callback sending previews of image artifacts to the model.
+
+    Only the request is changed, the artifacts keep their full resolution
+    for generate_video and the other tools.
+    """
+    session_id = callback_context._invocation_context.session.id
+    for content in llm_request.contents:
+        parts = content.parts or []
+        for i in range(1, len(parts)):
+            name = _artifact_name(parts[i - 1])
+            part = parts[i]
+            if (
+                name is not None
+                and part.inline_data
+                and (part.inline_data.mime_type or "").startswith("image/")
+            ):
+                parts[i] = await _preview(session_id, name, part)
+    return None
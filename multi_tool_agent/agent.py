@@ -1,20 +1,25 @@
 import datetime
-from typing import Optional
-from zoneinfo import ZoneInfo
 
 from google.adk.agents import (
     Agent,
     LlmAgent,  # Any agent
 )
-from google.adk.agents.callback_context import CallbackContext
 from google.adk.artifacts import InMemoryArtifactService  # Or GcsArtifactService
-from google.adk.models import LlmRequest, LlmResponse
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from google.adk.tools import agent_tool
-from google.genai import types
 
+try:
+    from llm_cache import model_callbacks
+except ImportError:  # Deployed without the llm_cache package.
+    def model_callbacks(agent, *before, ttl=None):
+        return {"before_model_callback": list(before), "after_model_callback": []}
 
+from .cities import city_index
+from .short_circuit import ShortCircuit, final
+from .sub_agent_tools import sub_agent_tool
+
+
+@final(template="{report}")
 def get_weather(city: str) -> dict:
     """Retrieves the current weather report for a specified city.
 
@@ -24,13 +29,11 @@ def get_weather(city: str) -> dict:
     Returns:
         dict: status and result or error msg.
     """
-    if city.lower() == "new york":
+    city_info = city_index.resolve(city)
+    if city_info and city_info.weather:
         return {
             "status": "success",
-            "report": (
-                "The weather in New York is sunny with a temperature of 25 degrees"
-                " Celsius (77 degrees Fahrenheit)."
-            ),
+            "report": f"The weather in {city_info.name} is {city_info.weather}.",
         }
     else:
         return {
@@ -39,6 +42,7 @@ def get_weather(city: str) -> dict:
         }
 
 
+@final(template="{report}")
 def get_current_time(city: str) -> dict:
     """Returns the current time in a specified city.
 
@@ -49,9 +53,8 @@ def get_current_time(city: str) -> dict:
         dict: status and result or error msg.
     """
 
-    if city.lower() == "new york":
-        tz_identifier = "America/New_York"
-    else:
+    city_info = city_index.resolve(city)
+    if not city_info or not city_info.timezone:
         return {
             "status": "error",
             "error_message": (
@@ -59,13 +62,13 @@ def get_current_time(city: str) -> dict:
             ),
         }
 
-    tz = ZoneInfo(tz_identifier)
-    now = datetime.datetime.now(tz)
+    now = datetime.datetime.now(city_info.tz)
     report = (
-        f'The current time in {city} is {now.strftime("%Y-%m-%d %H:%M:%S %Z%z")}'
+        f'The current time in {city_info.name} is {now.strftime("%Y-%m-%d %H:%M:%S %Z%z")}'
     )
     return {"status": "success", "report": report}
 
+@final(formatter=lambda result: ", ".join(result["landmarks"]))
 def get_landmarks(city: str) -> dict:
     """Returns the landmarks in a specified city.
 
@@ -76,10 +79,11 @@ def get_landmarks(city: str) -> dict:
         dict: status and result or error msg.
     """
 
-    if city.lower() == "new york":
+    city_info = city_index.resolve(city)
+    if city_info and city_info.landmarks:
         return {
             "status": "success",
-            "landmarks": ["Statue of Liberty", "Empire State Building", "Central Park"],
+            "landmarks": list(city_info.landmarks),
         }
     else:
         return {
@@ -89,64 +93,32 @@ def get_landmarks(city: str) -> dict:
 
 
 
-def skip_summarization(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
-    print("callback_context")  
-    print("--------------------------------")               
-    print(callback_context.agent_name)
-    print(callback_context.user_content)
-    print("llm_request")
-    print("--------------------------------")  
-    print(llm_request.contents)
-    print("--------------------------------")  
-    response = None
-    last_user_message = ''
-    if llm_request.contents and llm_request.contents[-1].role == 'user':
-        last_message = llm_request.contents[-1]
-        if (
-            last_message.parts
-            and last_message.parts[0].function_response
-        ):
-            print("function_response skipping?")
-            last_user_message = last_message.parts[0].function_response.response.get('result', '')
-            if last_user_message:
-                print("function_response skipping!")
-                print(last_user_message)
-                response = LlmResponse(
-                    content=types.Content(
-                        role='model',
-                        parts=[types.Part(text=last_user_message)],
-                    )
-                )
-            last_user_message = last_message.parts[0].function_response.response.get('landmarks', '')
-            if last_user_message:
-                print("function_response skipping!")
-                print(last_user_message)
-                response = LlmResponse(
-                    content=types.Content(
-                        role='model',
-                        parts=[types.Part(text=', '.join(last_user_message))],
-                    )
-                )
-    return response
-
 landmarks_agent = Agent(
     name="landmarks_agent",
     model="gemini-2.0-flash",
     description="Agent to answer questions about landmarks in a city.",
     instruction="You are a helpful agent who can answer user questions about landmarks in a city.",
-    # before_model_callback=skip_summarization,
+    before_model_callback=ShortCircuit.from_tools([get_landmarks]),
     tools=[get_landmarks],
 )
 
+# Directly get_landmarks by default (SUB_AGENT_MODE). As an AgentTool, the sub
+# agent already answers in plain text, pass it on as is.
+landmarks_tool = sub_agent_tool(landmarks_agent)
+if not getattr(landmarks_tool, "final_result", None):
+    landmarks_tool = final(template="{result}")(landmarks_tool)
+root_tools = [get_weather, get_current_time, landmarks_tool]
+
 root_agent = Agent(
     name="weather_time_agent",
     model="gemini-2.0-flash",
     description=(
-        "Agent to answer questions about the time and weather in a city. You can use the landmarks_agent tool to get information about landmarks in a city."
+        "Agent to answer questions about the time and weather in a city. You can also give information about landmarks in a city."
     ),
     instruction=(
         "You are a helpful agent who can answer user questions about the time and weather in a city."
     ),
-    # before_model_callback=skip_summarization,
-    tools=[get_weather, get_current_time, agent_tool.AgentTool(landmarks_agent)],
+    # Weather reports go stale, keep their answers for a minute only.
+    **model_callbacks("weather_time_agent", ShortCircuit.from_tools(root_tools), ttl=60),
+    tools=root_tools,
 )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from agent import root_agent
+from multi_tool_agent.agent import root_agent
 from vertexai.preview.reasoning_engines import AdkApp
 
 
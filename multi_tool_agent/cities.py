@@ -0,0 +1,127 @@
+import bisect
+import difflib
+import functools
+import mmap
+import os
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+CITIES_FILE = os.getenv(
+    "CITIES_FILE", os.path.join(os.path.dirname(__file__), "data", "cities.tsv")
+)
+# Keys sharing the most trigrams with a misspelt query that are compared to
+# it, and trigrams common enough to say nothing about a key (skipped).
+MAX_FUZZY_CANDIDATES = 20
+MAX_POSTINGS = 500
+
+
+def normalize(name: str) -> str:
+    """Lowercase ASCII words, e.g. "  São-Paulo " -> "sao paulo"."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@functools.lru_cache(maxsize=None)
+def timezone(key: str) -> ZoneInfo:
+    return ZoneInfo(key)
+
+
+class City(NamedTuple):
+    name: str
+    timezone: str
+    landmarks: Tuple[str, ...]
+    weather: str
+
+    @property
+    def tz(self) -> ZoneInfo:
+        return timezone(self.timezone)
+
+
+class CityIndex:
+    """Name and alias index over a memory-mapped TSV of cities.
+
+    Only the line offsets (an array) and the sorted normalized keys are held
+    in memory, rows are parsed from the map on demand. Lookups are a binary
+    search for exact and prefix matches, then a fuzzy match over the few keys
+    sharing the most trigrams with the query.
+
+    File format, one city per line, lists separated by "|", "#" comments:
+    name, aliases, timezone, landmarks, weather.
+    """
+
+    def __init__(self, path: str = CITIES_FILE):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = array("Q")
+        entries = []
+        position = 0
+        while position < len(self._map):
+            end = self._map.find(b"\n", position)
+            end = len(self._map) if end == -1 else end
+            line = self._map[position:end]
+            if line.strip() and not line.startswith(b"#"):
+                row = len(self._offsets)
+                self._offsets.append(position)
+                name, aliases = line.decode().split("\t")[:2]
+                for key in {normalize(name), *(normalize(alias) for alias in aliases.split("|"))}:
+                    if key:
+                        entries.append((key, row))
+            position = end + 1
+        entries.sort()
+        self._keys: List[str] = [key for key, _ in entries]
+        self._rows = array("I", (row for _, row in entries))
+        postings: Dict[str, array] = {}
+        for i, key in enumerate(self._keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array("I")).append(i)
+        self._trigrams = {
+            gram: keys for gram, keys in postings.items() if len(keys) <= MAX_POSTINGS
+        }
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @functools.lru_cache(maxsize=4096)
+    def city(self, row: int) -> City:
+        start = self._offsets[row]
+        end = self._map.find(b"\n", start)
+        fields = self._map[start : end if end != -1 else len(self._map)].decode().split("\t")
+        name, _, tz, landmarks, weather = (fields + [""] * 5)[:5]
+        return City(name, tz, tuple(filter(None, landmarks.split("|"))), weather)
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        start = bisect.bisect_left(self._keys, prefix)
+        return start, bisect.bisect_left(self._keys, prefix + "\uffff", start)
+
+    @functools.lru_cache(maxsize=4096)
+    def resolve(self, query: str) -> Optional[City]:
+        """The city named, aliased, uniquely prefixed or closely spelled by `query`."""
+        key = normalize(query)
+        if not key:
+            return None
+        start, end = self._prefix_range(key)
+        if start < end and self._keys[start] == key:
+            return self.city(self._rows[start])
+        rows = set(self._rows[start:end])
+        if len(rows) == 1:
+            return self.city(rows.pop())
+        shared = Counter()
+        for gram in trigrams(key):
+            shared.update(self._trigrams.get(gram, ()))
+        candidates = [self._keys[i] for i, _ in shared.most_common(MAX_FUZZY_CANDIDATES)]
+        match = difflib.get_close_matches(key, candidates, n=1, cutoff=0.8)
+        if match:
+            return self.city(self._rows[bisect.bisect_left(self._keys, match[0])])
+        return None
+
+
+city_index = CityIndex()
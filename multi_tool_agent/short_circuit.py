@@ -0,0 +1,99 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_KEY = "skipped_model_calls"
+
+
+@dataclass
+class FinalResult:
+    """How to answer the user directly with a tool result.
+
+    `template` is formatted with the result dict, `formatter` gets the dict
+    and returns the text. Either may give up on a result (missing key, None)
+    and the model then summarizes it as usual. Error results are answered
+    with their error_message.
+    """
+
+    template: Optional[str] = None
+    formatter: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None
+
+    def render(self, result: Dict[str, Any]) -> Optional[str]:
+        if result.get("status") == "error":
+            return result.get("error_message")
+        if self.formatter:
+            return self.formatter(result)
+        try:
+            return self.template.format(**result)
+        except (AttributeError, KeyError, IndexError):
+            return None
+
+
+def final(template: Optional[str] = None, formatter: Optional[Callable] = None):
+    """Marks a tool function or an AgentTool as giving the final answer."""
+
+    def mark(tool):
+        tool.final_result = FinalResult(template, formatter)
+        return tool
+
+    return mark
+
+
+class ShortCircuit:
+    """before_model_callback skipping the model call after final tool results.
+
+    When every function response of the last turn comes from a tool marked
+    with `final`, the rendered results are returned as the model response,
+    saving the call that would only summarize them. Skipped calls are
+    counted in `skipped`, per tool in `skipped_by_tool` and in the
+    SKIPPED_KEY session state.
+    """
+
+    def __init__(self, results: Dict[str, FinalResult]):
+        self.results = results
+        self.skipped = 0
+        self.skipped_by_tool: Counter = Counter()
+
+    @classmethod
+    def from_tools(cls, tools: Iterable[Any]) -> "ShortCircuit":
+        results = {}
+        for tool in tools:
+            result = getattr(tool, "final_result", None)
+            if result:
+                results[getattr(tool, "name", None) or tool.__name__] = result
+        return cls(results)
+
+    def __call__(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        if not llm_request.contents or llm_request.contents[-1].role != "user":
+            return None
+        parts = llm_request.contents[-1].parts or []
+        responses = [part.function_response for part in parts if part.function_response]
+        if not responses or len(responses) != len(parts):
+            return None
+        texts = []
+        for response in responses:
+            result = self.results.get(response.name)
+            text = result.render(response.response or {}) if result else None
+            if text is None:
+                return None
+            texts.append(str(text))
+        self.skipped += 1
+        self.skipped_by_tool.update(response.name for response in responses)
+        callback_context.state[SKIPPED_KEY] = callback_context.state.get(SKIPPED_KEY, 0) + 1
+        logger.info(
+            "Answered %s from tool results, %d model calls skipped so far",
+            callback_context.agent_name,
+            self.skipped,
+        )
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="\n".join(texts))])
+        )
@@ -0,0 +1,77 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.tools import FunctionTool, ToolContext, agent_tool
+
+# "direct": a sub agent with a single function tool is replaced by that tool.
+# "cached": the sub agent runs behind an AgentTool memoizing its answers.
+# "agent": a plain AgentTool.
+SUB_AGENT_MODE = os.getenv("SUB_AGENT_MODE", "direct")
+SUB_AGENT_CACHE_TTL = float(os.getenv("SUB_AGENT_CACHE_TTL", "3600"))
+SUB_AGENT_CACHE_SIZE = 1024
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class CachedAgentTool(agent_tool.AgentTool):
+    """AgentTool reusing the sub agent's answer to the same request for `ttl` seconds.
+
+    Requests are compared after lowercasing and collapsing whitespace. A
+    cached answer skips the sub agent run, so state changes it would have
+    made are not replayed.
+    """
+
+    def __init__(self, agent, ttl: float = SUB_AGENT_CACHE_TTL, max_size: int = SUB_AGENT_CACHE_SIZE, **kwargs):
+        super().__init__(agent, **kwargs)
+        self.ttl = ttl
+        self.max_size = max_size
+        self._results: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+
+    async def run_async(self, *, args: dict, tool_context: ToolContext) -> Any:
+        key = (self.agent.name, json.dumps(_normalize(args), sort_keys=True))
+        cached = self._results.get(key)
+        if cached and cached[0] > time.monotonic():
+            self._results.move_to_end(key)
+            return cached[1]
+        result = await super().run_async(args=args, tool_context=tool_context)
+        self._results[key] = (time.monotonic() + self.ttl, result)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+        return result
+
+
+def _single_function(agent) -> Any:
+    if not isinstance(agent, LlmAgent) or agent.sub_agents or len(agent.tools) != 1:
+        return None
+    tool = agent.tools[0]
+    if isinstance(tool, FunctionTool):
+        return tool.func
+    return tool if callable(tool) and not hasattr(tool, "run_async") else None
+
+
+def sub_agent_tool(agent, mode: str = SUB_AGENT_MODE):
+    """The tool a parent agent uses to reach `agent` in the given mode.
+
+    In "direct" mode, agents that are not a single function tool fall back
+    to "cached".
+    """
+    if mode == "direct":
+        function = _single_function(agent)
+        if function is not None:
+            return function
+        mode = "cached"
+    if mode == "cached":
+        return CachedAgentTool(agent)
+    return agent_tool.AgentTool(agent)